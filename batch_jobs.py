@@ -0,0 +1,153 @@
+import os
+import glob
+import json
+from split_spritesheet import CONFIG_KEYS
+
+# TOML y YAML son opcionales: JSON siempre está disponible
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# Archivo de trabajos que usa batch_split.py si no se indica otro
+DEFAULT_JOB_FILE = 'spritesheets.json'
+
+# Prefijo de las hojas que no lo indican: el nombre del archivo sin extensión
+DEFAULT_PREFIX = '{stem}'
+
+class JobFileError(ValueError):
+    """Error en un archivo de trabajos: formato, claves desconocidas o patrones sin hojas"""
+
+def load_job_file(path):
+    """
+    Lee un archivo de trabajos JSON, TOML (Python 3.11+ o tomli) o YAML (PyYAML)
+    según su extensión
+    """
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        if extension == '.toml':
+            if tomllib is None:
+                raise JobFileError("Leer TOML necesita Python 3.11+ o el paquete tomli")
+            with open(path, 'rb') as f:
+                data = tomllib.load(f)
+        elif extension in ('.yaml', '.yml'):
+            if yaml is None:
+                raise JobFileError("Leer YAML necesita el paquete PyYAML")
+            with open(path, 'r', encoding='utf-8') as f:
+                data = yaml.safe_load(f) or {}
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+    except OSError as e:
+        raise JobFileError(f"No se pudo leer {path}: {e}")
+    except JobFileError:
+        raise
+    except Exception as e:
+        # Errores de sintaxis de cada formato (json, tomllib, yaml)
+        raise JobFileError(f"{path} no es un archivo de trabajos válido: {e}")
+
+    if not isinstance(data, dict) or not isinstance(data.get('sheets'), list):
+        raise JobFileError(f"{path} debe tener una lista 'sheets' con las hojas a dividir")
+    return data
+
+def expand_jobs(data, base_dir='.'):
+    """
+    Expande un archivo de trabajos en la lista de configuraciones del lote
+
+    Cada entrada de 'sheets' indica una hoja o un patrón glob ('file', relativo a
+    base_dir; admite '**'). Las opciones se combinan de menor a mayor prioridad:
+    'defaults', 'directories' (las de cada carpeta que contiene la hoja, de la más
+    general a la más concreta) y la propia entrada. El prefijo admite {stem}
+    (nombre del archivo sin extensión) y {dir} (nombre de su carpeta).
+
+    Una hoja con el mismo prefijo que otra anterior la sobrescribe: las opciones de
+    la entrada posterior se aplican encima (ajustes de una hoja concreta sobre un
+    patrón). Las entradas idénticas se cuentan como repetidas.
+
+    Returns:
+        (configuraciones en orden de declaración, número de entradas repetidas)
+    """
+    defaults = _check_keys(data.get('defaults') or {}, 'defaults')
+    directories = {os.path.normpath(os.path.join(base_dir, directory)): _check_keys(options, directory)
+                   for directory, options in (data.get('directories') or {}).items()}
+
+    jobs = {}
+    repeated = 0
+    for number, entry in enumerate(data['sheets']):
+        entry = _check_keys(entry, f"sheets[{number}]")
+        if 'file' not in entry:
+            raise JobFileError(f"sheets[{number}] no indica 'file'")
+
+        pattern = os.path.join(base_dir, entry['file'])
+        files = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        if not files:
+            raise JobFileError(f"sheets[{number}]: ninguna hoja coincide con {entry['file']}")
+
+        for path in files:
+            path = os.path.normpath(path)
+            config = dict(defaults)
+            for directory in _parent_directories(path):
+                config.update(directories.get(directory, {}))
+            config.update(entry)
+            config['file'] = path
+            config['prefix'] = _expand_prefix(config.get('prefix', DEFAULT_PREFIX), path, number)
+
+            key = (os.path.normcase(os.path.abspath(path)), config['prefix'])
+            if key in jobs:
+                if jobs[key] == config:
+                    repeated += 1
+                else:
+                    jobs[key].update({k: v for k, v in entry.items() if k not in ('file', 'prefix')})
+                continue
+            jobs[key] = config
+
+    return list(jobs.values()), repeated
+
+def schedule_jobs(configs):
+    """
+    Ordena las hojas de mayor a menor tamaño de archivo para que las más lentas
+    empiecen primero y el pool quede repartido al final del lote; las que no
+    existen van al final y se reportan como error al procesarlas
+    """
+    def size(config):
+        try:
+            return os.stat(config['file']).st_size
+        except OSError:
+            return -1
+    return sorted(configs, key=size, reverse=True)
+
+def _check_keys(options, where):
+    if not isinstance(options, dict):
+        raise JobFileError(f"{where}: se esperaba un diccionario de opciones")
+    unknown = sorted(set(options) - set(CONFIG_KEYS))
+    if unknown:
+        raise JobFileError(f"{where}: opciones desconocidas {', '.join(unknown)}")
+    return options
+
+def _parent_directories(path):
+    """Carpetas que contienen una hoja, de la más general a la más concreta"""
+    parents = []
+    directory = os.path.dirname(path)
+    while True:
+        parents.append(directory or '.')
+        parent = os.path.dirname(directory)
+        if not directory or parent == directory:
+            break
+        directory = parent
+    return reversed(parents)
+
+def _expand_prefix(prefix, path, number):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    directory = os.path.basename(os.path.dirname(os.path.abspath(path)))
+    try:
+        return prefix.format(stem=stem, dir=directory)
+    except (KeyError, IndexError, ValueError) as e:
+        raise JobFileError(f"sheets[{number}]: prefijo inválido {prefix!r} ({e})")
@@ -1,66 +1,56 @@
 import os
-from split_spritesheet import batch_split_spritesheets
-
-# Configuración para múltiples spritesheets
-SPRITESHEET_CONFIGS = [
-    {
-        'file': 'player_idle.png',
-        'prefix': 'idle',
-        'cols': 4,
-        'rows': 1,
-        'start_number': 0,
-        'organize_by': None  # Sin organización especial
-    },
-    {
-        'file': 'player_walk.png', 
-        'prefix': 'walk',
-        'cols': 8,
-        'rows': 2,
-        'start_number': 0,
-        'organize_by': 'column'  # Organizar por columnas
-    },
-    {
-        'file': 'player_attack.png',
-        'prefix': 'attack', 
-        'cols': 6,
-        'rows': 3,
-        'start_number': 0,
-        'organize_by': 'row'  # Organizar por filas
-    },
-    {
-        'file': 'enemy_walk.png',
-        'prefix': 'walk',
-        'cols': 6,
-        'rows': 1,
-        'start_number': 0,
-        'organize_by': None
-    }
-]
+import sys
+import argparse
+from batch_jobs import DEFAULT_JOB_FILE, JobFileError, expand_jobs, load_job_file, schedule_jobs
+from split_spritesheet import batch_split_spritesheets, print_batch_summary
 
 def main():
+    parser = argparse.ArgumentParser(description='Procesa por lotes los spritesheets de un archivo de trabajos')
+    parser.add_argument('job_file', nargs='?', default=DEFAULT_JOB_FILE,
+                       help=f'Archivo de trabajos JSON, TOML o YAML (por defecto: {DEFAULT_JOB_FILE})')
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                       help='Hojas a procesar en paralelo (0 = todos los núcleos, 1 = en serie)')
+    parser.add_argument('--max-in-flight', type=int,
+                       help='Máximo de hojas decodificadas en memoria a la vez (por defecto: --jobs)')
+    parser.add_argument('--force', action='store_true',
+                       help='Dividir todas las hojas y reescribir sus frames aunque no hayan cambiado')
+    parser.add_argument('--list', action='store_true',
+                       help='Mostrar las hojas del archivo de trabajos sin dividirlas')
+    args = parser.parse_args()
+
+    # Expandir una sola vez patrones, opciones por carpeta y ajustes por hoja
+    try:
+        data = load_job_file(args.job_file)
+        configs, repeated = expand_jobs(data, os.path.dirname(args.job_file))
+    except JobFileError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print(f"📋 {args.job_file}: {len(configs)} hojas"
+          + (f" ({repeated} entradas repetidas omitidas)" if repeated else ""))
+
+    if args.list:
+        for config in configs:
+            options = ', '.join(f"{key}={value}" for key, value in config.items() if key not in ('file', 'prefix'))
+            print(f"   - {config['file']} → {config['prefix']}" + (f" ({options})" if options else ""))
+        return 0
+
     print("🚀 Iniciando procesamiento por lotes de spritesheets")
     print("📁 Todos los frames se guardarán en: sprites/")
     print()
-    
-    # Verificar que los archivos existan
-    missing_files = []
-    for config in SPRITESHEET_CONFIGS:
-        if not os.path.exists(config['file']):
-            missing_files.append(config['file'])
-    
-    if missing_files:
-        print("❌ Archivos faltantes:")
-        for file in missing_files:
-            print(f"   - {file}")
-        print("\n💡 Coloca los archivos en la misma carpeta que este script")
-        return
-    
-    # Procesar todos los spritesheets
-    batch_split_spritesheets(SPRITESHEET_CONFIGS)
-    
+
+    # Procesar todos los spritesheets, los más grandes primero; las hojas que no
+    # existen se reportan como error en el resumen
+    summary = batch_split_spritesheets(schedule_jobs(configs), args.jobs, args.max_in_flight, args.force)
+    print_batch_summary(summary)
+
+    if summary['failed']:
+        return 1
+
     print("\n" + "="*50)
     print("✅ ¡Procesamiento por lotes completado!")
     print("📁 Revisa la carpeta 'sprites/' para ver los resultados")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
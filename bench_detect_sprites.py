@@ -0,0 +1,56 @@
+import sys
+import time
+import argparse
+from PIL import Image, ImageDraw
+from frame_analysis import detect_sprites
+
+def build_sheet(size=8192, cell=64):
+    """
+    Hoja sintética de size x size con un sprite de tres partes sueltas (separadas
+    2-3 px) por cada celda de cell px: con merge_distance=3 cada sprite se une
+    """
+    sheet = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sheet)
+    for y in range(0, size, cell):
+        for x in range(0, size, cell):
+            draw.rectangle((x + 8, y + 8, x + 30, y + 40), fill=(200, 50, 50, 255))
+            draw.rectangle((x + 33, y + 8, x + 50, y + 20), fill=(50, 200, 50, 255))
+            draw.rectangle((x + 33, y + 23, x + 40, y + 50), fill=(50, 50, 200, 255))
+    return sheet
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Mide detect_sprites sobre una hoja grande y falla si unir las partes sueltas es lento')
+    parser.add_argument('--size', type=int, default=8192, help='Lado de la hoja en px (por defecto: 8192)')
+    parser.add_argument('--merge-distance', type=int, default=3,
+                        help='Distancia para unir partes sueltas (por defecto: 3)')
+    parser.add_argument('--limit', type=float, default=1.0,
+                        help='Segundos máximos que puede añadir la unión de cajas (por defecto: 1.0)')
+    args = parser.parse_args()
+
+    sheet = build_sheet(args.size)
+    sheet.load()
+
+    start = time.perf_counter()
+    parts = detect_sprites(sheet)
+    base = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sprites = detect_sprites(sheet, merge_distance=args.merge_distance)
+    merged = time.perf_counter() - start
+
+    print(f"📊 Hoja {args.size}x{args.size}: {len(parts)} partes, {len(sprites)} sprites")
+    print(f"⏱️  Sin unir: {base:.2f}s | merge_distance={args.merge_distance}: {merged:.2f}s "
+          f"(unión: {merged - base:.2f}s)")
+
+    expected = (args.size // 64) ** 2
+    if len(sprites) != expected:
+        print(f"❌ Se esperaban {expected} sprites")
+        sys.exit(1)
+    if merged - base > args.limit:
+        print(f"❌ La unión de cajas supera {args.limit:.1f}s")
+        sys.exit(1)
+    print("✅ Dentro del límite")
+
+if __name__ == "__main__":
+    main()
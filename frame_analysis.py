@@ -0,0 +1,713 @@
+import re
+from PIL import Image, ImageChops
+
+# NumPy es opcional: acelera el análisis de la hoja completa si está instalado
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Lado de las celdas de la rejilla con la que merge_boxes busca cajas cercanas
+MERGE_CELL_SIZE = 64
+
+# Modos cuyos píxeles se pueden recorrer como un array NumPy sin paleta
+ARRAY_MODES = ('L', 'LA', 'RGB', 'RGBA')
+
+# Políticas disponibles para decidir si un frame está vacío
+EMPTY_POLICIES = {
+    'transparent': 'Todos los píxeles son completamente transparentes (alfa = 0)',
+    'alpha': 'Todos los píxeles tienen alfa menor o igual al umbral indicado',
+    'color': 'Todos los píxeles son de un único color de fondo',
+}
+
+def parse_color(value):
+    """
+    Convierte un color en texto ('#RRGGBB', '#RRGGBBAA' o 'r,g,b[,a]') a una tupla
+    Retorna None si el valor está vacío
+    """
+    if value is None or isinstance(value, tuple):
+        return value
+
+    value = value.strip()
+    if not value:
+        return None
+
+    if value.startswith('#'):
+        hex_value = value[1:]
+        try:
+            if len(hex_value) not in (6, 8):
+                raise ValueError
+            return tuple(int(hex_value[i:i + 2], 16) for i in range(0, len(hex_value), 2))
+        except ValueError:
+            raise ValueError(f"Color hexadecimal inválido: {value}") from None
+
+    try:
+        parts = [int(part) for part in value.split(',')]
+    except ValueError:
+        parts = []
+    if len(parts) not in (3, 4) or any(not 0 <= part <= 255 for part in parts):
+        raise ValueError(f"Color inválido: {value}")
+    return tuple(parts)
+
+def parse_size(value):
+    """
+    Convierte un tamaño en texto ('WxH' o 'N' para cuadrado) a una tupla (ancho, alto)
+    Retorna None si el valor está vacío
+    """
+    if value is None or isinstance(value, tuple):
+        return value
+
+    value = value.strip().lower()
+    if not value:
+        return None
+
+    parts = value.split('x')
+    if len(parts) == 1:
+        parts = parts * 2
+    try:
+        width, height = (int(part) for part in parts)
+    except ValueError:
+        raise ValueError(f"Tamaño inválido: {value} (usa ANCHOxALTO, ej: 32x48)")
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Tamaño inválido: {value}")
+    return (width, height)
+
+def get_alpha_band(image):
+    """
+    Obtiene la banda alfa de una imagen sin convertirla entera a RGBA
+    Retorna None si la imagen no tiene transparencia (todos los píxeles son opacos)
+    """
+    if 'A' in image.getbands():
+        return image.getchannel('A')
+
+    # Imágenes con paleta o color transparente declarado en los metadatos
+    if 'transparency' in image.info:
+        return image.convert('RGBA').getchannel('A')
+
+    return None
+
+def is_transparent(image, alpha_threshold=0):
+    """Verifica si todos los píxeles tienen alfa <= alpha_threshold"""
+    alpha = get_alpha_band(image)
+    if alpha is None:
+        return False
+
+    if alpha_threshold <= 0:
+        # getbbox() devuelve None cuando toda la banda es 0
+        return alpha.getbbox() is None
+
+    _, max_alpha = alpha.getextrema()
+    return max_alpha <= alpha_threshold
+
+def is_background(image, background=None, tolerance=0):
+    """
+    Verifica si todos los píxeles son del color de fondo
+    Si no se indica background, basta con que el frame sea de un color uniforme
+    """
+    if background is None:
+        extrema = image.getextrema()
+        if not isinstance(extrema[0], tuple):
+            extrema = (extrema,)
+        return all(high - low <= tolerance for low, high in extrema)
+
+    mode = 'RGBA' if len(background) == 4 else 'RGB'
+    if image.mode != mode:
+        image = image.convert(mode)
+
+    difference = ImageChops.difference(image, Image.new(mode, image.size, background))
+    return all(high <= tolerance for _, high in difference.getextrema())
+
+def is_empty_frame(image, policy='transparent', alpha_threshold=0, background=None):
+    """
+    Verifica si un frame está vacío según la política indicada
+
+    Args:
+        image: Frame a comprobar
+        policy: 'transparent', 'alpha', 'color' o una función image -> bool
+        alpha_threshold: Umbral de alfa para la política 'alpha'
+        background: Color de fondo para la política 'color' (None = color uniforme)
+    """
+    if callable(policy):
+        return policy(image)
+
+    if policy == 'transparent':
+        return is_transparent(image)
+    elif policy == 'alpha':
+        return is_transparent(image, alpha_threshold)
+    elif policy == 'color':
+        return is_background(image, parse_color(background))
+
+    raise ValueError(f"Política de frames vacíos desconocida: {policy}")
+
+def trim_box(alpha, box):
+    """
+    Caja (en coordenadas de la hoja) del contenido de una celda según la banda alfa
+    Solo recorta la banda alfa de la celda; sin banda alfa se conserva la celda entera
+    """
+    if alpha is None:
+        return box
+
+    bbox = alpha.crop(box).getbbox()
+    if bbox is None:
+        # Celda totalmente transparente: se conserva un píxel para no perderla
+        bbox = (0, 0, 1, 1)
+    return (box[0] + bbox[0], box[1] + bbox[1], box[0] + bbox[2], box[1] + bbox[3])
+
+def map_pixels(mode, size, buffer):
+    """
+    Imagen de solo lectura sobre un buffer crudo de píxeles (por ejemplo, un
+    archivo mapeado en memoria) sin copiarlo
+
+    Con NumPy el mismo buffer queda expuesto como array para share_pixels, que
+    así no copia la hoja.
+    """
+    image = Image.frombuffer(mode, size, buffer, 'raw', mode, 0, 1)
+    if np is not None and mode in ARRAY_MODES:
+        shape = (size[1], size[0]) if len(mode) == 1 else (size[1], size[0], len(mode))
+        image._shared_pixels = np.frombuffer(buffer, dtype=np.uint8).reshape(shape)
+    return image
+
+def share_pixels(image):
+    """
+    Expone los píxeles de la hoja como un array NumPy (filas, columnas[, canales])
+
+    Los frames se toman después como vistas de ese array, sin copias, para
+    hashearlos y recortarlos; solo se materializan al codificarlos. Las hojas de
+    map_pixels (caché de píxeles) ya tienen su array y no se copian; el resto se
+    copia una sola vez y, en modos L y RGBA, la imagen retornada usa el mismo
+    buffer que el array: conviene reemplazar con ella la hoja decodificada para
+    no conservar las dos copias.
+
+    Returns:
+        (imagen, array), o (image, None) si NumPy no está instalado o el modo
+        necesita paleta o color transparente
+    """
+    pixels = getattr(image, '_shared_pixels', None)
+    if pixels is not None:
+        return image, pixels
+
+    if np is None or image.mode not in ARRAY_MODES or 'transparency' in image.info:
+        return image, None
+
+    pixels = np.asarray(image)
+    if image.mode in ('L', 'RGBA'):
+        image = Image.frombuffer(image.mode, image.size, pixels, 'raw', image.mode, 0, 1)
+        image._shared_pixels = pixels
+    return image, pixels
+
+def trim_view_box(pixels, box):
+    """
+    Caja del contenido de una celda calculada sobre la vista NumPy de la hoja
+    Equivale a trim_box: sin canal alfa se conserva la celda entera
+    """
+    if pixels.ndim < 3 or pixels.shape[2] not in (2, 4):
+        return box
+
+    alpha = pixels[box[1]:box[3], box[0]:box[2], -1]
+    rows = np.flatnonzero(alpha.max(axis=1))
+    if len(rows) == 0:
+        # Celda totalmente transparente: se conserva un píxel para no perderla
+        return (box[0], box[1], box[0] + 1, box[1] + 1)
+    cols = np.flatnonzero(alpha.max(axis=0))
+    return (box[0] + int(cols[0]), box[1] + int(rows[0]),
+            box[0] + int(cols[-1]) + 1, box[1] + int(rows[-1]) + 1)
+
+def as_image(frame):
+    """Materializa un frame (vista NumPy o imagen) como imagen de Pillow para codificarlo"""
+    if isinstance(frame, Image.Image):
+        return frame
+    return Image.fromarray(np.ascontiguousarray(frame))
+
+def trim_frame(image):
+    """
+    Recorta un frame a la caja de sus píxeles no transparentes
+    Retorna (imagen recortada, (offset_x, offset_y))
+    """
+    alpha = get_alpha_band(image)
+    if alpha is None:
+        return image, (0, 0)
+
+    box = trim_box(alpha, (0, 0) + image.size)
+    return image.crop(box), (box[0], box[1])
+
+def compute_occupancy_grid(sheet, cols, rows, frame_width, frame_height,
+                           policy='transparent', alpha_threshold=0, background=None,
+                           margin_x=0, margin_y=0, spacing_x=0, spacing_y=0):
+    """
+    Calcula en una sola pasada qué celdas de la cuadrícula contienen contenido
+
+    Retorna una lista de filas con un booleano por columna (True = celda ocupada).
+    Con NumPy la hoja se reduce de una vez sobre una vista con pasos
+    (rows x frame_h x cols x frame_w) que salta márgenes y espaciado sin copiar;
+    sin NumPy se comprueba cada celda sobre la banda ya extraída, sin recortes RGBA.
+    """
+    grid = (cols, rows, frame_width, frame_height, margin_x, margin_y, spacing_x, spacing_y)
+
+    if callable(policy):
+        return [[not policy(sheet.crop(_cell_box(row, col, *grid[2:])))
+                 for col in range(cols)] for row in range(rows)]
+
+    if policy in ('transparent', 'alpha'):
+        band = get_alpha_band(sheet)
+        if band is None:
+            # Sin transparencia todas las celdas están ocupadas
+            return [[True] * cols for _ in range(rows)]
+        threshold = alpha_threshold if policy == 'alpha' else 0
+        return _occupancy_from_band(band, grid, threshold)
+
+    if policy == 'color':
+        return _occupancy_from_color(sheet, grid, parse_color(background))
+
+    raise ValueError(f"Política de frames vacíos desconocida: {policy}")
+
+def _cell_box(row, col, frame_width, frame_height, margin_x=0, margin_y=0, spacing_x=0, spacing_y=0):
+    """Coordenadas (left, upper, right, lower) de una celda de la cuadrícula"""
+    left = margin_x + col * (frame_width + spacing_x)
+    upper = margin_y + row * (frame_height + spacing_y)
+    return (left, upper, left + frame_width, upper + frame_height)
+
+def _grid_view(pixels, grid):
+    """
+    Vista (rows, frame_h, cols, frame_w, ...) de las celdas de un array de píxeles
+    Retorna None si la cuadrícula se sale de la imagen
+    """
+    cols, rows, frame_width, frame_height, margin_x, margin_y, spacing_x, spacing_y = grid
+    right = margin_x + cols * (frame_width + spacing_x) - spacing_x
+    lower = margin_y + rows * (frame_height + spacing_y) - spacing_y
+    if right > pixels.shape[1] or lower > pixels.shape[0]:
+        return None
+
+    origin = pixels[margin_y:, margin_x:]
+    row_stride, col_stride = origin.strides[:2]
+    return np.lib.stride_tricks.as_strided(
+        origin,
+        shape=(rows, frame_height, cols, frame_width) + origin.shape[2:],
+        strides=(row_stride * (frame_height + spacing_y), row_stride,
+                 col_stride * (frame_width + spacing_x), col_stride) + origin.strides[2:],
+        writeable=False)
+
+def _occupancy_from_band(band, grid, threshold):
+    """Ocupación por celda a partir de una banda alfa (valor > threshold = ocupado)"""
+    cols, rows = grid[:2]
+    if np is not None:
+        cells = _grid_view(np.asarray(band), grid)
+        if cells is not None:
+            return (cells.max(axis=(1, 3)) > threshold).tolist()
+
+    if threshold > 0:
+        # Binarizar una sola vez para que getbbox() detecte los píxeles sobre el umbral
+        band = band.point(lambda value: 255 if value > threshold else 0)
+
+    return [[band.crop(_cell_box(row, col, *grid[2:])).getbbox() is not None
+             for col in range(cols)] for row in range(rows)]
+
+def _occupancy_from_color(sheet, grid, background):
+    """Ocupación por celda con la política 'color'"""
+    cols, rows = grid[:2]
+    if np is not None and background is not None:
+        mode = 'RGBA' if len(background) == 4 else 'RGB'
+        pixels = np.asarray(sheet if sheet.mode == mode else sheet.convert(mode))
+        cells = _grid_view(pixels, grid)
+        if cells is not None:
+            differs = cells != np.array(background, dtype=pixels.dtype)
+            return differs.any(axis=(1, 3, 4)).tolist()
+
+    return [[not is_background(sheet.crop(_cell_box(row, col, *grid[2:])), background)
+             for col in range(cols)] for row in range(rows)]
+
+def build_grid(sheet_width, sheet_height, cols=None, rows=None, frame_width=None, frame_height=None,
+               margin_x=0, margin_y=0, spacing_x=0, spacing_y=0):
+    """
+    Completa la geometría de una cuadrícula regular y comprueba que cabe en la hoja
+
+    En cada eje basta con indicar el número de celdas o el tamaño del frame:
+    con el número de celdas, el espacio que queda sin márgenes ni espaciado se
+    reparte entre ellas; con el tamaño, se usan todas las celdas que caben
+    a partir del margen.
+
+    Returns:
+        Diccionario con 'cols', 'rows', 'frame_width', 'frame_height', 'margin_x',
+        'margin_y', 'spacing_x' y 'spacing_y' (el mismo formato que infer_grid)
+    """
+    cols, frame_width = _grid_axis(sheet_width, cols, frame_width, margin_x, spacing_x, 'columnas')
+    rows, frame_height = _grid_axis(sheet_height, rows, frame_height, margin_y, spacing_y, 'filas')
+    return {
+        'cols': cols, 'rows': rows,
+        'frame_width': frame_width, 'frame_height': frame_height,
+        'margin_x': margin_x, 'margin_y': margin_y,
+        'spacing_x': spacing_x, 'spacing_y': spacing_y
+    }
+
+def _grid_axis(length, count, size, margin, spacing, name):
+    """Número de celdas y tamaño del frame en un eje de la cuadrícula"""
+    if margin < 0 or spacing < 0:
+        raise ValueError("El margen y el espaciado no pueden ser negativos")
+
+    if size is None:
+        if not count or count <= 0:
+            raise ValueError(f"Indica el número de {name} o el tamaño del frame")
+        size = (length - 2 * margin - (count - 1) * spacing) // count
+    elif not count:
+        count = (length - margin + spacing) // (size + spacing)
+
+    end = margin + count * (size + spacing) - spacing
+    if size <= 0 or count <= 0 or end > length:
+        raise ValueError(f"La cuadrícula de {name} no cabe en la hoja "
+                         f"({count} x {size}px con margen {margin} y espaciado {spacing}, "
+                         f"la hoja mide {length}px)")
+    return count, size
+
+def grid_cells(sheet_width, sheet_height, cols, rows, frame_width=None, frame_height=None,
+               margin_x=0, margin_y=0, spacing_x=0, spacing_y=0):
+    """
+    Tabla de celdas de una cuadrícula regular
+    Si no se indica el tamaño del frame, se reparte el espacio de la hoja que
+    queda sin márgenes ni espaciado entre las columnas y filas.
+    Retorna una lista de (row, col, (left, upper, right, lower)) en orden de lectura
+    """
+    if frame_width is None:
+        frame_width = (sheet_width - 2 * margin_x - (cols - 1) * spacing_x) // cols
+    if frame_height is None:
+        frame_height = (sheet_height - 2 * margin_y - (rows - 1) * spacing_y) // rows
+    return [(row, col, _cell_box(row, col, frame_width, frame_height,
+                                 margin_x, margin_y, spacing_x, spacing_y))
+            for row in range(rows) for col in range(cols)]
+
+def infer_grid(sheet, alpha_threshold=0, background=None):
+    """
+    Deduce la cuadrícula de una hoja regular a partir de sus separaciones vacías
+
+    Proyecta la máscara de contenido sobre cada eje (una sola pasada con
+    getprojection) y busca en cada eje la cuadrícula más ajustada (márgenes
+    iguales a ambos lados y espaciado constante) en la que cada tramo ocupado
+    cae entero dentro de una celda distinta. Las columnas vacías comunes a todas
+    las celdas se interpretan como margen y espaciado.
+
+    Args:
+        sheet: Imagen de la hoja
+        alpha_threshold: Alfa máximo que se considera transparente
+        background: Color de fondo de hojas sin transparencia (None = color del
+                    píxel superior izquierdo)
+
+    Returns:
+        Diccionario con 'cols', 'rows', 'frame_width', 'frame_height', 'margin_x',
+        'margin_y', 'spacing_x' y 'spacing_y', o None si no hay una cuadrícula regular
+    """
+    x_projection, y_projection = _content_band(sheet, alpha_threshold, background).getprojection()
+    x_axis = _infer_axis(x_projection)
+    y_axis = _infer_axis(y_projection)
+    if x_axis is None or y_axis is None:
+        return None
+
+    return {
+        'cols': x_axis[0], 'rows': y_axis[0],
+        'frame_width': x_axis[1], 'frame_height': y_axis[1],
+        'margin_x': x_axis[2], 'margin_y': y_axis[2],
+        'spacing_x': x_axis[3], 'spacing_y': y_axis[3]
+    }
+
+def _content_band(sheet, alpha_threshold=0, background=None):
+    """Banda 'L' distinta de cero en los píxeles con contenido"""
+    band = get_alpha_band(sheet) if background is None else None
+    if band is not None:
+        if alpha_threshold > 0:
+            band = band.point(lambda value: 255 if value > alpha_threshold else 0)
+        return band
+
+    # Sin transparencia: contenido = píxeles distintos del color de fondo
+    background = parse_color(background)
+    mode = 'RGBA' if background is not None and len(background) == 4 else 'RGB'
+    image = sheet if sheet.mode == mode else sheet.convert(mode)
+    if background is None:
+        background = image.getpixel((0, 0))
+
+    difference = ImageChops.difference(image, Image.new(mode, image.size, background))
+    channels = difference.split()
+    band = channels[0]
+    for channel in channels[1:]:
+        band = ImageChops.lighter(band, channel)
+    return band
+
+def _projection_runs(projection):
+    """Tramos (inicio, fin) de valores distintos de cero de una proyección"""
+    data = bytes(1 if value else 0 for value in projection)
+    return [match.span() for match in re.finditer(b'\x01+', data)]
+
+def _infer_axis(projection):
+    """
+    Cuadrícula de un eje a partir de su proyección
+    Retorna (celdas, tamaño, margen, espaciado) o None
+    """
+    runs = _projection_runs(projection)
+    if not runs:
+        return None
+
+    length = len(projection)
+    longest = max(end - start for start, end in runs)
+    max_margin = min(runs[0][0], length - runs[-1][1])
+    gutter = min((b[0] - a[1] for a, b in zip(runs, runs[1:])), default=0)
+
+    # Un tramo por celda, con el menor número de celdas posible
+    for count in range(len(runs), length // longest + 1):
+        # Separaciones exportadas: el hueco más estrecho entre tramos es el espaciado
+        if count > 1:
+            for margin in range(max_margin, -1, -1):
+                grid = _fit_axis(runs, length, count, margin, gutter, longest)
+                if grid:
+                    return grid
+        # Si no, la cuadrícula con menos margen y espaciado
+        for spacing in range(gutter + 1 if count > 1 else 1):
+            for margin in range(max_margin + 1):
+                grid = _fit_axis(runs, length, count, margin, spacing, longest)
+                if grid:
+                    return grid
+
+    # Sprites con partes separadas: varios tramos pueden compartir celda
+    for count in range(len(runs) - 1, 0, -1):
+        for spacing in range(gutter + 1 if count > 1 else 1):
+            for margin in range(max_margin + 1):
+                grid = _fit_axis(runs, length, count, margin, spacing, longest, shared=True)
+                if grid:
+                    return grid
+
+    return None
+
+def _fit_axis(runs, length, count, margin, spacing, longest, shared=False):
+    """
+    Verifica que cada tramo cae entero dentro de una celda (distinta salvo con shared)
+    Retorna (celdas, tamaño, margen, espaciado) o None
+    """
+    size, extra = divmod(length - 2 * margin - (count - 1) * spacing, count)
+    if extra or size < longest:
+        return None
+
+    period = size + spacing
+    previous = -1
+    for start, end in runs:
+        cell = (start - margin) // period
+        if cell < previous or (cell == previous and not shared) or cell >= count:
+            return None
+        if end > margin + cell * period + size:
+            return None
+        previous = cell
+    return (count, size, margin, spacing)
+
+def detect_sprites(sheet, alpha_threshold=0, merge_distance=0, min_area=0):
+    """
+    Detecta las cajas de los sprites de una hoja irregular (sin cuadrícula)
+
+    Etiqueta las regiones conectadas (8-vecinos) de píxeles con alfa > alpha_threshold
+    por tramos: cada fila se divide en tramos opacos y los tramos que se tocan con
+    los de la fila anterior se unen con union-find, con coste lineal en el número
+    de tramos. Con NumPy los tramos, sus uniones y las cajas se calculan vectorizados.
+
+    Args:
+        sheet: Imagen de la hoja
+        alpha_threshold: Alfa máximo que se considera transparente
+        merge_distance: Une cajas separadas por esta distancia o menos (partes sueltas)
+        min_area: Descarta cajas con menos píxeles de área (ruido)
+
+    Returns:
+        Lista de (row, col, (left, upper, right, lower)) en orden de lectura, donde
+        row es la línea de sprites y col la posición dentro de la línea
+    """
+    band = get_alpha_band(sheet)
+    if band is None:
+        width, height = sheet.size
+        return [(0, 0, (0, 0, width, height))]
+
+    if np is not None:
+        sprite_boxes = _component_boxes_numpy(band, alpha_threshold)
+    else:
+        sprite_boxes = _component_boxes_scanline(band, alpha_threshold)
+
+    if merge_distance > 0:
+        sprite_boxes = merge_boxes(sprite_boxes, merge_distance)
+    if min_area > 0:
+        sprite_boxes = [box for box in sprite_boxes
+                        if (box[2] - box[0]) * (box[3] - box[1]) >= min_area]
+
+    return order_boxes(sprite_boxes)
+
+def _component_boxes_numpy(band, threshold):
+    """Cajas de las regiones conectadas de una banda alfa usando NumPy"""
+    mask = np.asarray(band) > threshold
+    height, width = mask.shape
+    stride = width + 2
+
+    # Tramos opacos por fila: inicio (incluido) y fin (excluido). Con una columna
+    # vacía a cada lado, los cambios 0->1 y 1->0 se alternan en el array aplanado
+    padded = np.zeros((height, stride), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    changes = np.flatnonzero(np.diff(padded.ravel())) + 1
+    if len(changes) == 0:
+        return []
+    run_rows, run_starts = np.divmod(changes[0::2], stride)
+    run_ends = changes[1::2] % stride
+    run_starts -= 1
+    run_ends -= 1
+    count = len(run_rows)
+
+    # Tramos de la fila anterior que tocan a cada tramo (incluye diagonales)
+    start_keys = run_rows * stride + run_starts
+    end_keys = run_rows * stride + run_ends
+    previous_row = (run_rows - 1) * stride
+    first = np.searchsorted(end_keys, previous_row + run_starts, side='left')
+    last = np.searchsorted(start_keys, previous_row + run_ends, side='right')
+    touches = np.maximum(last - first, 0)
+
+    total = int(touches.sum())
+    edge_b = np.repeat(np.arange(count), touches)
+    offsets = np.arange(total) - np.repeat(np.cumsum(touches) - touches, touches)
+    edge_a = np.repeat(first, touches) + offsets
+
+    # Union-find vectorizado: enganchar raíces a la menor etiqueta y comprimir caminos
+    labels = np.arange(count)
+    while total:
+        root_a = labels[edge_a]
+        root_b = labels[edge_b]
+        pending = root_a != root_b
+        if not pending.any():
+            break
+        smallest = np.minimum(root_a[pending], root_b[pending])
+        np.minimum.at(labels, root_a[pending], smallest)
+        np.minimum.at(labels, root_b[pending], smallest)
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+    # Caja de cada componente a partir de sus tramos
+    roots, component = np.unique(labels, return_inverse=True)
+    lefts = np.full(len(roots), width)
+    uppers = np.full(len(roots), height)
+    rights = np.zeros(len(roots), dtype=run_ends.dtype)
+    lowers = np.zeros(len(roots), dtype=run_rows.dtype)
+    np.minimum.at(lefts, component, run_starts)
+    np.minimum.at(uppers, component, run_rows)
+    np.maximum.at(rights, component, run_ends)
+    np.maximum.at(lowers, component, run_rows + 1)
+
+    return list(zip(lefts.tolist(), uppers.tolist(), rights.tolist(), lowers.tolist()))
+
+def _component_boxes_scanline(band, threshold):
+    """Cajas de las regiones conectadas de una banda alfa sin NumPy (tramos por fila)"""
+    width, height = band.size
+    # Binarizar la banda alfa: 1 = píxel ocupado
+    data = band.point(lambda value: 1 if value > threshold else 0).tobytes()
+    run_pattern = re.compile(b'\x01+')
+
+    parent = []
+    boxes = []
+    previous = []
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for y in range(height):
+        row = data[y * width:(y + 1) * width]
+        if b'\x01' not in row:
+            previous = []
+            continue
+
+        current = []
+        for match in run_pattern.finditer(row):
+            run_id = len(parent)
+            parent.append(run_id)
+            boxes.append([match.start(), y, match.end(), y + 1])
+            current.append((match.start(), match.end(), run_id))
+
+        # Unir con los tramos de la fila anterior que se tocan (incluye diagonales)
+        i = j = 0
+        while i < len(previous) and j < len(current):
+            prev_start, prev_end, prev_id = previous[i]
+            start, end, run_id = current[j]
+            if prev_start <= end and start <= prev_end:
+                root_a, root_b = find(prev_id), find(run_id)
+                if root_a != root_b:
+                    parent[root_b] = root_a
+            if prev_end < end:
+                i += 1
+            else:
+                j += 1
+        previous = current
+
+    # Caja de cada componente a partir de sus tramos
+    components = {}
+    for run_id, box in enumerate(boxes):
+        root = find(run_id)
+        if root in components:
+            merged = components[root]
+            merged[0] = min(merged[0], box[0])
+            merged[1] = min(merged[1], box[1])
+            merged[2] = max(merged[2], box[2])
+            merged[3] = max(merged[3], box[3])
+        else:
+            components[root] = list(box)
+
+    return [tuple(box) for box in components.values()]
+
+def merge_boxes(boxes, distance, cell_size=MERGE_CELL_SIZE):
+    """
+    Une las cajas separadas por distance píxeles o menos hasta que no queden pares
+
+    Las cajas se reparten en una rejilla de celdas de cell_size píxeles: cada caja
+    solo se compara con las ya unidas que ocupan las celdas de su caja ampliada en
+    distance, no con todas (coste casi lineal en el número de cajas). Las celdas
+    incluyen el borde derecho e inferior de cada caja, así que dos cajas a
+    distance píxeles o menos siempre comparten alguna.
+    """
+    boxes = list(boxes)
+    merged_any = True
+    while merged_any:
+        merged_any = False
+        result = []
+        buckets = {}
+        for box in sorted(boxes):
+            left, upper, right, lower = box
+            candidates = set()
+            for y in range((upper - distance) // cell_size, (lower + distance) // cell_size + 1):
+                for x in range((left - distance) // cell_size, (right + distance) // cell_size + 1):
+                    candidates.update(buckets.get((x, y), ()))
+
+            # Primero las más recientes (las más cercanas en 'left'), como en una pasada lineal
+            for index in sorted(candidates, reverse=True):
+                other = result[index]
+                if (left - other[2] <= distance and other[0] - right <= distance
+                        and upper - other[3] <= distance and other[1] - lower <= distance):
+                    box = (min(left, other[0]), min(upper, other[1]),
+                           max(right, other[2]), max(lower, other[3]))
+                    result[index] = box
+                    merged_any = True
+                    break
+            else:
+                index = len(result)
+                result.append(box)
+
+            # La caja (o la unión) se registra en todas las celdas que ocupa
+            for y in range(box[1] // cell_size, box[3] // cell_size + 1):
+                for x in range(box[0] // cell_size, box[2] // cell_size + 1):
+                    buckets.setdefault((x, y), []).append(index)
+        boxes = result
+    return boxes
+
+def order_boxes(boxes):
+    """
+    Ordena cajas en orden de lectura: agrupa en líneas las que se solapan
+    verticalmente y dentro de cada línea ordena de izquierda a derecha
+    """
+    lines = []
+    for box in sorted(boxes, key=lambda b: (b[1], b[0])):
+        if lines and box[1] < lines[-1]['lower']:
+            lines[-1]['boxes'].append(box)
+            lines[-1]['lower'] = max(lines[-1]['lower'], box[3])
+        else:
+            lines.append({'lower': box[3], 'boxes': [box]})
+
+    return [(row, col, box)
+            for row, line in enumerate(lines)
+            for col, box in enumerate(sorted(line['boxes']))]
@@ -0,0 +1,153 @@
+import io
+from PIL import Image
+from frame_analysis import as_image
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Formatos de salida de los frames: formato de Pillow, extensión, modos que admite
+# el codificador (los demás se convierten) y opciones de guardado
+OUTPUT_FORMATS = {
+    'PNG': {'pillow': 'PNG', 'extension': 'png', 'modes': None, 'options': {}},
+    # JPEG no tiene canal alfa: los frames con transparencia se guardan en RGB
+    'JPEG': {'pillow': 'JPEG', 'extension': 'jpeg', 'modes': ('L', 'RGB'), 'options': {}},
+    # WebP con pérdida conserva el alfa (sin pérdida en el canal alfa)
+    'WEBP': {'pillow': 'WEBP', 'extension': 'webp', 'modes': ('RGB', 'RGBA'),
+             'options': {'quality': 90, 'alpha_quality': 100}},
+    'WEBP_LOSSLESS': {'pillow': 'WEBP', 'extension': 'webp', 'modes': ('RGB', 'RGBA'),
+                      'options': {'lossless': True}},
+    # QOI: sin pérdida, se codifica y decodifica varias veces más rápido que PNG
+    'QOI': {'pillow': 'QOI', 'extension': 'qoi', 'modes': ('RGB', 'RGBA'), 'options': {}}
+}
+
+# Perfiles de codificación PNG: nivel de compresión zlib (0-9), pasada extra de
+# optimize de Pillow y paleta para los frames con 256 colores o menos
+PNG_PROFILES = {
+    'fast': {'compress_level': 1, 'optimize': False, 'palette': False},
+    'balanced': {'compress_level': 6, 'optimize': False, 'palette': True},
+    'smallest': {'compress_level': 9, 'optimize': True, 'palette': True}
+}
+
+# Valores por defecto de Pillow, la base de las opciones sueltas sin perfil
+PNG_DEFAULTS = {'compress_level': 6, 'optimize': False, 'palette': False}
+
+# Colores máximos de un frame que se guarda con paleta (PNG de 8 bits)
+PALETTE_COLORS = 256
+
+def output_extension(format):
+    """Extensión de los archivos de un formato de salida (sin punto)"""
+    return OUTPUT_FORMATS[format.upper()]['extension']
+
+def check_output_format(format):
+    """
+    Verifica que el formato de salida existe y que Pillow tiene su codificador
+    (WebP necesita libwebp y QOI, Pillow 11.3 o posterior); lanza ValueError si no
+    """
+    spec = OUTPUT_FORMATS.get(format.upper())
+    if spec is None:
+        raise ValueError(f"Formato de salida desconocido: {format} (usa {', '.join(OUTPUT_FORMATS)})")
+    Image.init()
+    if spec['pillow'] not in Image.SAVE:
+        raise ValueError(f"Esta versión de Pillow no puede guardar {format.upper()}")
+
+def png_encoding(profile=None, compress_level=None, optimize=None, palette=None):
+    """
+    Opciones de codificación PNG: las del perfil (o, sin perfil, las de Pillow,
+    ver PNG_DEFAULTS) con los valores indicados encima
+    Retorna None si no se indicó nada (opciones por defecto de Pillow)
+    """
+    if profile is None and compress_level is None and optimize is None and palette is None:
+        return None
+
+    if profile is not None and profile not in PNG_PROFILES:
+        raise ValueError(f"Perfil PNG desconocido: {profile} (usa {', '.join(PNG_PROFILES)})")
+    if compress_level is not None and not 0 <= compress_level <= 9:
+        raise ValueError(f"El nivel de compresión PNG debe estar entre 0 y 9: {compress_level}")
+
+    options = dict(PNG_PROFILES[profile] if profile else PNG_DEFAULTS)
+    if compress_level is not None:
+        options['compress_level'] = compress_level
+    if optimize is not None:
+        options['optimize'] = optimize
+    if palette is not None:
+        options['palette'] = palette
+    return options
+
+def to_palette(image):
+    """
+    Convierte sin pérdida un frame con 256 colores o menos a modo 'P'
+
+    Cada píxel recibe exactamente el índice de su color RGBA (sin buscar el
+    color más cercano ni perder el alfa): la paleta guarda el RGB de cada color
+    y la tabla de transparencia su alfa, de modo que dos colores con el mismo RGB
+    y distinto alfa son entradas distintas.
+    Retorna (imagen con paleta, transparencia) o None si no se puede convertir.
+    """
+    if image.mode not in ('RGB', 'RGBA', 'LA'):
+        return None
+    rgba = image.convert('RGBA')
+
+    if np is not None:
+        # Cada píxel RGBA como un entero de 32 bits: np.unique da los colores y el índice de cada píxel
+        packed = np.ascontiguousarray(np.asarray(rgba)).view(np.uint32).reshape(-1)
+        colors, indices = np.unique(packed, return_inverse=True)
+        if len(colors) > PALETTE_COLORS:
+            return None
+        colors = colors.view(np.uint8).reshape(-1, 4)
+        data = indices.astype(np.uint8).tobytes()
+    else:
+        counted = rgba.getcolors(PALETTE_COLORS)
+        if counted is None:
+            return None
+        colors = [color for _, color in counted]
+        lookup = {color: index for index, color in enumerate(colors)}
+        data = bytes(lookup[pixel] for pixel in rgba.getdata())
+
+    indexed = Image.frombytes('P', image.size, data)
+    indexed.putpalette(bytes(value for color in colors for value in color[:3]))
+
+    transparency = None
+    alphas = bytes(int(color[3]) for color in colors)
+    if alphas.count(255) != len(alphas):
+        transparency = alphas
+    return indexed, transparency
+
+def save_frame(frame, output_file, format, encoding=None):
+    """
+    Codifica y guarda un frame (imagen o vista NumPy); retorna la ruta escrita
+    encoding son las opciones de png_encoding (solo se aplican a PNG)
+    """
+    image = as_image(frame)
+    spec = OUTPUT_FORMATS[format.upper()]
+    if spec['modes'] and image.mode not in spec['modes']:
+        alpha = has_alpha(image)
+        if alpha and image.mode == 'P':
+            # La transparencia de la paleta pasa al canal alfa antes de convertir
+            image = image.convert('RGBA')
+        if image.mode not in spec['modes']:
+            image = image.convert('RGBA' if alpha and 'RGBA' in spec['modes'] else 'RGB')
+    if spec['pillow'] != 'PNG' or not encoding:
+        image.save(output_file, spec['pillow'], **spec['options'])
+        return output_file
+
+    options = {'compress_level': encoding['compress_level'], 'optimize': encoding['optimize']}
+    if encoding['palette']:
+        converted = to_palette(image)
+        if converted is not None:
+            image, transparency = converted
+            if transparency is not None:
+                options['transparency'] = transparency
+    image.save(output_file, 'PNG', **options)
+    return output_file
+
+def encode_frame(frame, format, encoding=None):
+    """Codifica un frame en memoria con save_frame; retorna sus bytes"""
+    buffer = io.BytesIO()
+    save_frame(frame, buffer, format, encoding)
+    return buffer.getvalue()
+
+def has_alpha(image):
+    """Verifica si una imagen tiene canal alfa o color transparente"""
+    return image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
@@ -0,0 +1,80 @@
+import os
+import json
+import glob
+import hashlib
+from manifest import is_frame_unchanged
+
+# Metadatos (recortes e índice de frames) que se guardan junto a los frames de cada hoja
+TRIM_METADATA_SUFFIX = '_trim.json'
+INDEX_METADATA_SUFFIX = '_index.json'
+
+def trim_metadata_name(prefix):
+    """Nombre del archivo de recortes de una hoja, relativo al destino (ver output_sinks)"""
+    return f"{prefix}{TRIM_METADATA_SUFFIX}"
+
+def index_metadata_name(prefix):
+    """Nombre del índice de frames (frame -> archivo) de una hoja deduplicada, relativo al destino"""
+    return f"{prefix}{INDEX_METADATA_SUFFIX}"
+
+def frame_key(output_file, output_dir):
+    """Nombre de un frame relativo a la carpeta de salida, con '/' como separador"""
+    return os.path.relpath(output_file, output_dir).replace(os.sep, '/')
+
+def trim_entry(cell_box, trimmed_box):
+    """
+    Metadatos de recorte de un frame (mismo formato que los atlas de TexturePacker)
+    spriteSourceSize es la posición y tamaño del frame recortado dentro de su celda
+    """
+    return {
+        'trimmed': trimmed_box != cell_box,
+        'spriteSourceSize': {
+            'x': trimmed_box[0] - cell_box[0],
+            'y': trimmed_box[1] - cell_box[1],
+            'w': trimmed_box[2] - trimmed_box[0],
+            'h': trimmed_box[3] - trimmed_box[1]
+        },
+        'sourceSize': {'w': cell_box[2] - cell_box[0], 'h': cell_box[3] - cell_box[1]}
+    }
+
+def index_entry(frame_number, row, col, name):
+    """
+    Entrada del índice de una hoja: número y celda del frame y archivo que lo contiene
+    name es el nombre del archivo relativo a la carpeta de salida (ver frame_key)
+    """
+    return {'frame': frame_number, 'row': row, 'col': col, 'file': name}
+
+def metadata_digest(data):
+    """Hash del contenido JSON de un archivo de metadatos"""
+    content = json.dumps(data, indent=2, sort_keys=True).encode('utf-8')
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+def save_metadata(path, data):
+    """Guarda un archivo JSON de metadatos de forma atómica (archivo temporal + reemplazo)"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+def update_metadata(path, data, previous_entry=None):
+    """
+    Guarda un archivo de metadatos solo si su contenido cambió desde la última ejecución
+    Retorna el hash del contenido para registrarlo en el manifiesto
+    """
+    digest = metadata_digest(data)
+    if not is_frame_unchanged(previous_entry, path, digest):
+        save_metadata(path, data)
+    return digest
+
+def load_trim_metadata(output_dir):
+    """
+    Reúne los recortes de todas las hojas de una carpeta de salida
+    Retorna un diccionario {nombre del frame: entrada de recorte}
+    """
+    frames = {}
+    for path in sorted(glob.glob(os.path.join(output_dir, f"*{TRIM_METADATA_SUFFIX}"))):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                frames.update(json.load(f).get('frames', {}))
+        except (OSError, ValueError):
+            continue
+    return frames
@@ -0,0 +1,219 @@
+import io
+import os
+import json
+import mmap
+import struct
+import hashlib
+from PIL import Image
+
+# Paquete de frames: un solo archivo con todos los frames codificados de una hoja,
+# pensado para mapearlo en memoria y leer cada frame por su número
+#
+#   cabecera   HEADER: firma, versión, reservado, número de frames, offset de la
+#              tabla y offset de los metadatos
+#   datos      frames codificados (PNG, QOI...) uno tras otro; los repetidos se
+#              guardan una sola vez y sus entradas apuntan a los mismos bytes
+#   tabla      una entrada ENTRY por frame, en orden: offset y tamaño de los datos,
+#              ancho y alto del frame, posición del recorte dentro de la celda y
+#              tamaño de la celda original (enteros de 32 bits: admite hojas y
+#              frames de 65536 píxeles o más)
+#   metadatos  JSON UTF-8 hasta el final del archivo: formato, opciones de
+#              codificación y nombre, número, celda y hash de cada frame
+#
+# Todos los enteros son little-endian.
+PACK_MAGIC = b'FPAK'
+PACK_VERSION = 2
+PACK_SUFFIX = '.fpack'
+HEADER = struct.Struct('<4sHHIQQ')
+ENTRY = struct.Struct('<QIIIIIII')
+
+def pack_path(output_dir, prefix):
+    """Ruta del paquete de frames de una hoja dentro de la carpeta de salida"""
+    return os.path.join(output_dir, f"{prefix}{PACK_SUFFIX}")
+
+def pack_digest(table, metadata):
+    """Hash de la tabla de un paquete y sus metadatos"""
+    digest = hashlib.blake2b(table, digest_size=16)
+    digest.update(json.dumps(metadata, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+class FramePackWriter:
+    """
+    Escribe un paquete de frames en un archivo temporal que reemplaza al
+    definitivo al cerrarlo (close) o se descarta (abort)
+    """
+
+    def __init__(self, path, metadata=None):
+        self.path = path
+        self.temp_path = f"{path}.tmp"
+        self.metadata = dict(metadata or {})
+        self.entries = []
+        self.records = []
+        self.names = {}
+        self.file = open(self.temp_path, 'wb')
+        self.file.write(b'\0' * HEADER.size)
+
+    def add(self, name, data, size, trim_offset=(0, 0), source_size=None, **info):
+        """
+        Añade un frame codificado
+
+        Args:
+            name: Nombre del frame (ruta relativa con '/', como en la carpeta de salida)
+            data: Bytes del frame codificado
+            size: (ancho, alto) del frame
+            trim_offset: Posición del frame recortado dentro de su celda
+            source_size: Tamaño de la celda original (por defecto: size)
+            info: Metadatos del frame para el JSON (número, fila, columna, hash...)
+
+        Returns:
+            Número del frame dentro del paquete
+        """
+        offset = self.file.tell()
+        self.file.write(data)
+        source_size = source_size or size
+        return self._append(name, (offset, len(data), size[0], size[1], trim_offset[0], trim_offset[1],
+                                   source_size[0], source_size[1]), info)
+
+    def add_repeat(self, name, original, **info):
+        """Añade un frame idéntico a otro ya añadido (comparte sus datos y su recorte)"""
+        entry = self.entries[self.names[original]]
+        return self._append(name, entry, dict(info, same_as=original))
+
+    def _append(self, name, entry, info):
+        self.names[name] = len(self.entries)
+        self.entries.append(entry)
+        self.records.append(dict(info, name=name))
+        return len(self.entries) - 1
+
+    def digest(self):
+        """Hash del contenido del paquete (tabla y metadatos, con el hash de cada frame)"""
+        return pack_digest(b''.join(ENTRY.pack(*entry) for entry in self.entries), self._metadata())
+
+    def close(self):
+        """Escribe la tabla y los metadatos y reemplaza el paquete; retorna su ruta"""
+        table_offset = self.file.tell()
+        for entry in self.entries:
+            self.file.write(ENTRY.pack(*entry))
+        metadata_offset = self.file.tell()
+        self.file.write(json.dumps(self._metadata(), sort_keys=True).encode('utf-8'))
+
+        self.file.seek(0)
+        self.file.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, 0, len(self.entries),
+                                    table_offset, metadata_offset))
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+        return self.path
+
+    def abort(self):
+        """Descarta el paquete a medio escribir"""
+        self.file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    def _metadata(self):
+        return dict(self.metadata, version=PACK_VERSION, frames=self.records)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+class FramePack:
+    """
+    Lectura de un paquete de frames mapeado en memoria
+    Los frames se leen por número (pack[i]) o por nombre (pack.index(nombre))
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, _, count, table_offset, metadata_offset = HEADER.unpack_from(self.buffer, 0)
+            if magic != PACK_MAGIC or version != PACK_VERSION:
+                raise ValueError(f"{path} no es un paquete de frames válido")
+            if table_offset + count * ENTRY.size != metadata_offset or metadata_offset > len(self.buffer):
+                raise ValueError(f"El paquete de frames {path} está incompleto")
+            self.metadata = json.loads(self.buffer[metadata_offset:].decode('utf-8'))
+        except (struct.error, UnicodeDecodeError) as e:
+            self.buffer.close()
+            raise ValueError(f"{path} no es un paquete de frames válido: {e}")
+        except ValueError:
+            self.buffer.close()
+            raise
+
+        self.count = count
+        self.table_offset = table_offset
+        self.names = {record['name']: i for i, record in enumerate(self.metadata['frames'])}
+        self.digests = {}
+        for i, record in enumerate(self.metadata['frames']):
+            self.digests.setdefault(record.get('digest'), i)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        """Bytes codificados del frame index"""
+        if not 0 <= index < self.count:
+            raise IndexError(f"El paquete tiene {self.count} frames: {index}")
+        offset, size = ENTRY.unpack_from(self.buffer, self.table_offset + index * ENTRY.size)[:2]
+        return self.buffer[offset:offset + size]
+
+    def index(self, name):
+        """Número de un frame a partir de su nombre (KeyError si no existe)"""
+        return self.names[name]
+
+    def entry(self, index):
+        """Entrada de un frame: posición de sus datos, tamaños, recorte y metadatos del JSON"""
+        if not 0 <= index < self.count:
+            raise IndexError(f"El paquete tiene {self.count} frames: {index}")
+        values = ENTRY.unpack_from(self.buffer, self.table_offset + index * ENTRY.size)
+        entry = dict(zip(('offset', 'size', 'width', 'height', 'trim_x', 'trim_y',
+                          'source_width', 'source_height'), values))
+        entry.update(self.metadata['frames'][index])
+        return entry
+
+    def digest(self):
+        """Hash del contenido del paquete; coincide con FramePackWriter.digest del que lo escribió"""
+        return pack_digest(self.buffer[self.table_offset:self.table_offset + self.count * ENTRY.size],
+                           self.metadata)
+
+    def find_digest(self, digest):
+        """Número del primer frame con ese hash de píxeles; None si no hay ninguno"""
+        return self.digests.get(digest)
+
+    def open_frame(self, index):
+        """Decodifica un frame como imagen de Pillow"""
+        image = Image.open(io.BytesIO(self[index]))
+        image.load()
+        return image
+
+    def close(self):
+        self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+def open_previous_pack(path, format, encoding):
+    """
+    Abre el paquete de una ejecución anterior para reutilizar los frames que no
+    cambiaron; None si no existe, no es válido o se codificó con otras opciones
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        pack = FramePack(path)
+    except (OSError, ValueError):
+        return None
+    if pack.metadata.get('format') != format.upper() or pack.metadata.get('png_encoding') != encoding:
+        pack.close()
+        return None
+    return pack
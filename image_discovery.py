@@ -0,0 +1,115 @@
+import os
+from collections import namedtuple
+
+# Contenido de una carpeta: archivos, subcarpetas y cuáles de ellas son enlaces
+# simbólicos (se listan pero no se recorren, como en os.walk)
+Listing = namedtuple('Listing', 'files directories links')
+
+# Carpetas ya leídas en esta sesión: ruta -> (mtime de la carpeta, Listing)
+_scan_cache = {}
+
+def scan_directory(directory):
+    """
+    Lee una carpeta con un solo os.scandir (nombres ordenados, sin ocultos)
+
+    El resultado se guarda para la sesión y se reutiliza mientras la fecha de
+    modificación de la carpeta no cambie (cambia al crear, borrar o renombrar
+    archivos): volver a listarla cuesta un stat en lugar de recorrerla.
+    Lanza OSError si la carpeta no existe o no se puede leer.
+    """
+    # Clave absoluta: '.' cambia de carpeta con os.chdir (modo interactivo)
+    key = os.path.abspath(directory)
+    mtime = os.stat(directory).st_mtime_ns
+    cached = _scan_cache.get(key)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    files, directories, links = [], [], set()
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            # Los archivos ocultos se omiten, igual que con glob('*.png')
+            if entry.name.startswith('.'):
+                continue
+            try:
+                if entry.is_dir():
+                    directories.append(entry.name)
+                    if entry.is_symlink():
+                        links.add(entry.name)
+                elif entry.is_file():
+                    files.append(entry.name)
+            except OSError:
+                continue
+
+    listing = Listing(sorted(files), sorted(directories), links)
+    _scan_cache[key] = (mtime, listing)
+    return listing
+
+def clear_scan_cache(directories=None):
+    """
+    Olvida las carpetas leídas (todas, o solo las de directories), por ejemplo tras
+    cambios que no alteran su fecha de modificación (ver sheet_watcher.watch)
+    """
+    if directories is None:
+        _scan_cache.clear()
+        return
+    for directory in directories:
+        _scan_cache.pop(os.path.abspath(directory), None)
+
+def has_extension(name, extensions):
+    """Verifica la extensión de un archivo sin distinguir mayúsculas ('.png' o '.PNG')"""
+    return os.path.splitext(name)[1].lower() in extensions
+
+def find_images(directory='.', extensions=('.png',), max_depth=0):
+    """
+    Busca imágenes en una carpeta y, hasta max_depth niveles, en sus subcarpetas
+
+    Args:
+        directory: Carpeta donde buscar; con '.' se retornan los nombres sin ruta
+        extensions: Extensiones con punto, en minúsculas
+        max_depth: Niveles de subcarpetas a recorrer (0 = solo la carpeta, None = todos)
+
+    Returns:
+        Rutas de las imágenes, ordenadas por carpeta y nombre
+    """
+    images = []
+
+    def visit(path, depth):
+        try:
+            listing = scan_directory(path)
+        except OSError:
+            return
+        for name in listing.files:
+            if has_extension(name, extensions):
+                images.append(name if path == '.' else os.path.join(path, name))
+        if max_depth is None or depth < max_depth:
+            for name in listing.directories:
+                if name not in listing.links:
+                    visit(name if path == '.' else os.path.join(path, name), depth + 1)
+
+    visit(directory, 0)
+    return images
+
+def find_image_directories(base_dir='.', extensions=('.png',), max_depth=1):
+    """
+    Subcarpetas de base_dir (hasta max_depth niveles) que contienen imágenes
+
+    Cada carpeta se lee una sola vez. Lanza OSError si base_dir no se puede
+    leer; las subcarpetas ilegibles se omiten.
+    """
+    found = []
+
+    def visit(path, depth):
+        listing = scan_directory(path)
+        for name in listing.directories:
+            subdir = os.path.join(path, name)
+            try:
+                sublisting = scan_directory(subdir)
+            except OSError:
+                continue
+            if any(has_extension(file, extensions) for file in sublisting.files):
+                found.append(subdir)
+            if (max_depth is None or depth + 1 < max_depth) and name not in listing.links:
+                visit(subdir, depth + 1)
+
+    visit(base_dir, 0)
+    return sorted(found)
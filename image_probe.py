@@ -0,0 +1,188 @@
+import os
+import json
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+# Caché de cabeceras leídas, en la carpeta común de las imágenes listadas
+PROBE_CACHE_NAME = '.image_probe.json'
+PROBE_CACHE_VERSION = 1
+
+# Bytes que bastan para las cabeceras de PNG, GIF, BMP (con máscaras) y WebP
+HEADER_BYTES = 72
+
+# Modos de Pillow según el tipo de color de la cabecera IHDR de un PNG
+PNG_MODES = {0: 'L', 2: 'RGB', 3: 'P', 4: 'LA', 6: 'RGBA'}
+
+# Modos de Pillow según el número de componentes de un JPEG
+JPEG_MODES = {1: 'L', 3: 'RGB', 4: 'CMYK'}
+
+def probe_image(path):
+    """
+    Lee el ancho, alto y modo de una imagen solo de su cabecera
+
+    PNG (IHDR), GIF (pantalla lógica y paleta global), BMP, WebP y JPEG
+    (marcador SOF) se leen sin Pillow; el resto de formatos, los BMP con paleta
+    y los GIF sin paleta global se abren con Image.open (que tampoco decodifica
+    los píxeles).
+
+    Returns:
+        {'width', 'height', 'mode'}; lanza OSError o ValueError si no es una imagen
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_BYTES)
+        info = _parse_header(header)
+        if info is None and header[:6] in (b'GIF87a', b'GIF89a'):
+            info = _parse_gif(f, header)
+        elif info is None and header[:2] == b'\xff\xd8':
+            info = _parse_jpeg(f)
+    if info is None:
+        with Image.open(path) as image:
+            info = (image.width, image.height, image.mode)
+    width, height, mode = info
+    return {'width': width, 'height': height, 'mode': mode}
+
+def _parse_header(header):
+    """(ancho, alto, modo) de una cabecera PNG, BMP o WebP; None si no se reconoce"""
+    if header[:8] == b'\x89PNG\r\n\x1a\n' and header[12:16] == b'IHDR':
+        width, height, depth, color_type = struct.unpack('>IIBB', header[16:26])
+        if color_type == 0 and depth in (1, 16):
+            return width, height, '1' if depth == 1 else 'I;16'
+        return width, height, PNG_MODES[color_type]
+
+    if header[:2] == b'BM':
+        header_size = struct.unpack('<I', header[14:18])[0]
+        if header_size == 12:
+            width, height, _, bits = struct.unpack('<HHHH', header[18:26])
+            compression = 0
+        else:
+            width, height, _, bits, compression = struct.unpack('<iiHHI', header[18:34])
+        if bits <= 8:
+            # El modo depende de la paleta ('1', 'L' o 'P'): se deja a Pillow
+            return None
+        # BMP de 32 bits con máscaras de color (BI_BITFIELDS) y máscara de alfa
+        alpha = bits == 32 and compression in (3, 6) and header_size >= 56 and header[66:70] != b'\0' * 4
+        return width, abs(height), 'RGBA' if alpha else 'RGB'
+
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        chunk = header[12:16]
+        if chunk == b'VP8 ':
+            width, height = struct.unpack('<HH', header[26:30])
+            return width & 0x3fff, height & 0x3fff, 'RGB'
+        if chunk == b'VP8L':
+            bits = struct.unpack('<I', header[21:25])[0]
+            return ((bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1,
+                    'RGBA' if bits >> 28 & 1 else 'RGB')
+        if chunk == b'VP8X':
+            width = int.from_bytes(header[24:27], 'little') + 1
+            height = int.from_bytes(header[27:30], 'little') + 1
+            return width, height, 'RGBA' if header[20] & 0x10 else 'RGB'
+
+    return None
+
+def _parse_gif(f, header):
+    """
+    (ancho, alto, modo) de un GIF con paleta global; Pillow lo abre en modo 'L'
+    si la paleta es la escala de grises 0, 1, 2... y en 'P' si no
+    """
+    width, height, flags = struct.unpack('<HHB', header[6:11])
+    if not flags & 0x80:
+        return None
+    f.seek(13)
+    palette = f.read(3 << ((flags & 7) + 1))
+    grayscale = all(i // 3 == palette[i] == palette[i + 1] == palette[i + 2]
+                    for i in range(0, len(palette) - 2, 3))
+    return width, height, 'L' if grayscale else 'P'
+
+def _parse_jpeg(f):
+    """(ancho, alto, modo) del primer marcador SOF de un JPEG, saltando los segmentos anteriores"""
+    f.seek(2)
+    while True:
+        marker = f.read(4)
+        if len(marker) < 4 or marker[0] != 0xff:
+            return None
+        code = marker[1]
+        length = struct.unpack('>H', marker[2:])[0]
+        if 0xc0 <= code <= 0xcf and code not in (0xc4, 0xc8, 0xcc):
+            _, height, width, components = struct.unpack('>BHHB', f.read(6))
+            return width, height, JPEG_MODES.get(components, 'RGB')
+        f.seek(length - 2, os.SEEK_CUR)
+
+def probe_images(paths, cache_file=PROBE_CACHE_NAME, jobs=None):
+    """
+    Cabeceras de varias imágenes en un pool de hilos (la lectura es sobre todo
+    espera de disco o red)
+
+    Las cabeceras se guardan en cache_file con el tamaño y la fecha de
+    modificación de cada archivo: las imágenes que no cambiaron no se vuelven a
+    abrir. Un cache_file sin carpeta se guarda en la carpeta común de las
+    imágenes (ver probe_cache_path), no en la carpeta actual. Con
+    cache_file=None no se usa caché.
+
+    Returns:
+        Por cada ruta, {'width', 'height', 'mode', 'file_size'} o None si no se pudo leer
+    """
+    if cache_file and not os.path.dirname(cache_file):
+        cache_file = probe_cache_path(paths, cache_file)
+    cache = load_probe_cache(cache_file) if cache_file else {}
+
+    def probe(path):
+        try:
+            stat = os.stat(path)
+            key = os.path.normcase(os.path.abspath(path))
+            signature = [stat.st_size, stat.st_mtime_ns]
+            cached = cache.get(key)
+            if cached and cached['signature'] == signature:
+                return key, cached, False
+            info = dict(probe_image(path), file_size=stat.st_size)
+            return key, {'signature': signature, 'info': info}, True
+        except (OSError, ValueError, KeyError, struct.error):
+            return None, None, False
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(probe, paths))
+
+    if cache_file:
+        # Quitar las imágenes que ya no están en las carpetas listadas
+        keys = {key for key, _, _ in results if key}
+        directories = {os.path.dirname(key) for key in keys}
+        updated = {key: entry for key, entry in cache.items()
+                   if key in keys or os.path.dirname(key) not in directories}
+        updated.update((key, entry) for key, entry, _ in results if key)
+        if any(changed for _, _, changed in results) or len(updated) != len(cache):
+            save_probe_cache(updated, cache_file)
+
+    return [entry['info'] if entry else None for _, entry, _ in results]
+
+def probe_cache_path(paths, name=PROBE_CACHE_NAME):
+    """
+    Ruta de la caché de cabeceras de unas imágenes: name dentro de la carpeta
+    común a todas ellas (la carpeta listada); la carpeta actual si no hay
+    imágenes o no comparten ninguna (unidades distintas en Windows)
+    """
+    try:
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths])
+    except ValueError:
+        root = '.'
+    return os.path.join(root, name)
+
+def load_probe_cache(cache_file=PROBE_CACHE_NAME):
+    """Carga la caché de cabeceras; diccionario vacío si no existe o no se puede leer"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('version') != PROBE_CACHE_VERSION:
+        return {}
+    return data.get('images', {})
+
+def save_probe_cache(cache, cache_file=PROBE_CACHE_NAME):
+    """Guarda la caché de cabeceras de forma atómica; se ignora si la carpeta es de solo lectura"""
+    temp_path = f"{cache_file}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': PROBE_CACHE_VERSION, 'images': cache}, f, sort_keys=True)
+        os.replace(temp_path, cache_file)
+    except OSError:
+        pass
@@ -0,0 +1,153 @@
+import os
+import json
+import hashlib
+
+# Archivo de manifiesto que se guarda junto a los frames generados
+MANIFEST_NAME = '.split_manifest.json'
+MANIFEST_VERSION = 2
+
+def manifest_path(output_dir='sprites'):
+    """Ruta del manifiesto dentro de la carpeta de salida"""
+    return os.path.join(output_dir, MANIFEST_NAME)
+
+def load_manifest(output_dir='sprites'):
+    """
+    Carga el manifiesto de la carpeta de salida
+    Retorna un diccionario vacío si no existe o no se puede leer
+    """
+    try:
+        with open(manifest_path(output_dir), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if data.get('version') != MANIFEST_VERSION:
+        return {}
+    return data.get('sheets', {})
+
+def save_manifest(manifest, output_dir='sprites'):
+    """Guarda el manifiesto de forma atómica (archivo temporal + reemplazo)"""
+    os.makedirs(output_dir, exist_ok=True)
+    path = manifest_path(output_dir)
+    temp_path = f"{path}.tmp"
+
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'sheets': manifest}, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+def manifest_key(input_file, prefix):
+    """
+    Clave de una hoja en el manifiesto (ruta absoluta normalizada + prefijo)
+    El prefijo permite dividir la misma hoja varias veces con nombres distintos
+    """
+    return f"{os.path.normcase(os.path.abspath(input_file))}#{prefix}"
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """Calcula el hash SHA-256 del contenido de un archivo"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def frame_digest(frame, mode=None):
+    """
+    Hash del buffer de píxeles de un frame (incluye modo y tamaño)
+    frame puede ser una imagen o una vista NumPy (filas, columnas[, canales]) de la
+    hoja con su modo; la vista se recorre fila a fila sin copiarla y el hash coincide
+    con el de la imagen recortada equivalente
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if mode is None:
+        digest.update(f"{frame.mode}:{frame.size[0]}x{frame.size[1]}:".encode())
+        digest.update(frame.tobytes())
+        return digest.hexdigest()
+
+    height, width = frame.shape[:2]
+    digest.update(f"{mode}:{width}x{height}:".encode())
+    for row in frame:
+        digest.update(row)
+    return digest.hexdigest()
+
+def is_frame_unchanged(entry, output_file, digest):
+    """
+    Verifica si un frame ya fue escrito con el mismo contenido en una ejecución anterior
+    En ese caso no hace falta volver a codificarlo ni tocar el archivo
+    """
+    if not entry:
+        return False
+    return entry.get('frames', {}).get(output_file) == digest and os.path.exists(output_file)
+
+def reusable_entry(entry, params):
+    """
+    Entrada anterior de una hoja si sus frames se pueden reutilizar: escritos con
+    el mismo formato (WEBP y WEBP_LOSSLESS comparten extensión) y las mismas
+    opciones de PNG; None si no
+    """
+    if not entry:
+        return None
+    previous = entry.get('params', {})
+    if previous.get('format') != params['format'] or previous.get('png_encoding') != params['png_encoding']:
+        return None
+    return entry
+
+def build_entry(input_file, params, frames, digest=None):
+    """
+    Crea la entrada de manifiesto de una hoja recién dividida
+
+    Args:
+        frames: Diccionario {archivo de salida: hash del frame}
+    """
+    stat = os.stat(input_file)
+    return {
+        'source': input_file,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'sha256': digest or file_digest(input_file),
+        'params': params,
+        'frames': dict(frames)
+    }
+
+def is_up_to_date(manifest, input_file, params):
+    """
+    Verifica si una hoja ya fue dividida con los mismos parámetros y sin cambios
+
+    Primero compara tamaño y fecha de modificación; solo si la fecha cambió
+    se calcula el hash del contenido para confirmarlo.
+    """
+    entry = manifest.get(manifest_key(input_file, params.get('prefix')))
+    if not entry or entry.get('params') != params:
+        return False
+
+    try:
+        stat = os.stat(input_file)
+    except OSError:
+        return False
+
+    if stat.st_size != entry.get('size'):
+        return False
+
+    if stat.st_mtime != entry.get('mtime'):
+        if file_digest(input_file) != entry.get('sha256'):
+            return False
+        # Mismo contenido con otra fecha (ej: checkout): recordar la nueva fecha
+        entry['mtime'] = stat.st_mtime
+
+    # Los frames generados deben seguir existiendo
+    return all(os.path.exists(output) for output in entry.get('frames', {}))
+
+def remove_stale_outputs(old_entry, new_entry):
+    """
+    Elimina los frames de una ejecución anterior que ya no se generan
+    Retorna la lista de archivos eliminados
+    """
+    if not old_entry:
+        return []
+
+    current = new_entry.get('frames', {})
+    removed = []
+    for output in old_entry.get('frames', {}):
+        if output not in current and os.path.exists(output):
+            os.remove(output)
+            removed.append(output)
+    return removed
@@ -0,0 +1,231 @@
+import io
+import os
+import json
+import time
+import tarfile
+import zipfile
+from abc import ABC, abstractmethod
+from frame_metadata import metadata_digest, update_metadata
+from frame_pack import PACK_SUFFIX, FramePackWriter, open_previous_pack
+from manifest import is_frame_unchanged
+
+# Carpeta de salida por defecto (en la raíz de ejecución)
+DEFAULT_OUTPUT_DIR = 'sprites'
+
+class OutputSink(ABC):
+    """
+    Destino de los frames de una hoja
+
+    Los frames llegan ya codificados con un nombre relativo ('col_0/walk_3.png',
+    con '/' como separador). Solo los sinks incrementales (una carpeta o un
+    paquete .fpack) usan el manifiesto de su carpeta root para omitir hojas y
+    frames sin cambios; el resto se escribe completo en cada ejecución.
+    """
+
+    incremental = False
+
+    def begin(self, info):
+        """Inicio de una hoja: origen, prefijo, formato y opciones de codificación"""
+
+    @abstractmethod
+    def write(self, name, data, info=None):
+        """Guarda los bytes de un frame; info lleva su tamaño, recorte, número, fila, columna y hash"""
+
+    def write_repeat(self, name, original, info=None):
+        """Frame idéntico a otro ya escrito (dedup); por defecto solo aparece en el índice"""
+
+    def write_metadata(self, name, data, previous_entry=None):
+        """Guarda un JSON de metadatos (recortes o índice); retorna el hash de su contenido"""
+        self.write(name, json.dumps(data, indent=2, sort_keys=True).encode('utf-8'))
+        return metadata_digest(data)
+
+    def is_unchanged(self, name, digest, previous_entry):
+        """Verifica si el frame ya está en la salida con el mismo contenido (no hace falta entregarlo)"""
+        return False
+
+    def previous_frame(self, digest):
+        """Bytes ya codificados de un frame con ese contenido en la salida anterior; None si no hay"""
+        return None
+
+    def outputs(self, frames):
+        """Archivos de la salida para el manifiesto: {ruta: hash} a partir de {nombre: hash}"""
+        return {}
+
+    def location(self, name):
+        """Texto para mostrar dónde quedó un frame"""
+        return name
+
+    @abstractmethod
+    def describe(self):
+        """Texto para mostrar el destino"""
+
+    def close(self):
+        """Termina la salida (los archivos se reemplazan al cerrar)"""
+
+    def abort(self):
+        """Descarta la salida a medio escribir"""
+
+class DirectorySink(OutputSink):
+    """Un archivo por frame dentro de una carpeta (la estructura de 'sprites/' por defecto)"""
+
+    incremental = True
+
+    def __init__(self, root=DEFAULT_OUTPUT_DIR):
+        self.root = root
+
+    def path(self, name):
+        """Ruta en disco de un frame o archivo de metadatos"""
+        return os.path.join(self.root, *name.split('/'))
+
+    def write(self, name, data, info=None):
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def write_metadata(self, name, data, previous_entry=None):
+        # Solo se reescribe si el contenido cambió desde la última ejecución
+        return update_metadata(self.path(name), data, previous_entry)
+
+    def is_unchanged(self, name, digest, previous_entry):
+        return is_frame_unchanged(previous_entry, self.path(name), digest)
+
+    def outputs(self, frames):
+        return {self.path(name): digest for name, digest in frames.items()}
+
+    def location(self, name):
+        return os.path.relpath(self.path(name))
+
+    def describe(self):
+        return f"{self.root}/"
+
+class MemorySink(OutputSink):
+    """Frames en un diccionario {nombre: bytes}, para usar el divisor sin tocar el disco"""
+
+    def __init__(self, files=None):
+        self.files = {} if files is None else files
+
+    def write(self, name, data, info=None):
+        self.files[name] = data
+
+    def describe(self):
+        return "memoria"
+
+class ArchiveSink(OutputSink):
+    """
+    Frames dentro de un archivo .zip (sin comprimir: los PNG ya lo están) o .tar,
+    .tar.gz/.tgz; se escribe en un archivo temporal que reemplaza al definitivo al cerrar
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.temp_path = f"{path}.tmp"
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if path.lower().endswith('.zip'):
+            self.archive = zipfile.ZipFile(self.temp_path, 'w', zipfile.ZIP_STORED)
+        else:
+            compressed = path.lower().endswith(('.tar.gz', '.tgz'))
+            self.archive = tarfile.open(self.temp_path, 'w:gz' if compressed else 'w')
+
+    def write(self, name, data, info=None):
+        if isinstance(self.archive, zipfile.ZipFile):
+            self.archive.writestr(name, data)
+        else:
+            member = tarfile.TarInfo(name)
+            member.size = len(data)
+            member.mtime = time.time()
+            self.archive.addfile(member, io.BytesIO(data))
+
+    def location(self, name):
+        return f"{self.path}:{name}"
+
+    def describe(self):
+        return self.path
+
+    def close(self):
+        self.archive.close()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        self.archive.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+class PackSink(OutputSink):
+    """
+    Frames en un paquete .fpack (ver frame_pack); recortes y repetidos van en su tabla
+
+    Es incremental: el manifiesto de su carpeta registra el paquete, los frames
+    que no cambiaron se copian ya codificados del paquete anterior y, si el
+    contenido no cambió, se conserva el archivo anterior.
+    """
+
+    incremental = True
+
+    def __init__(self, path):
+        self.path = path
+        self.root = os.path.dirname(path) or '.'
+        self.writer = None
+        self.previous = None
+
+    def begin(self, info):
+        if self.writer is None:
+            os.makedirs(self.root, exist_ok=True)
+            self.previous = open_previous_pack(self.path, info['format'], info['png_encoding'])
+            self.writer = FramePackWriter(self.path, info)
+
+    def write(self, name, data, info=None):
+        info = dict(info or {})
+        size = info.pop('size')
+        self.writer.add(name, data, size, info.pop('trim_offset', (0, 0)), info.pop('source_size', None),
+                        **info)
+
+    def write_repeat(self, name, original, info=None):
+        info = {k: v for k, v in (info or {}).items() if k not in ('size', 'trim_offset', 'source_size')}
+        self.writer.add_repeat(name, original, **info)
+
+    def write_metadata(self, name, data, previous_entry=None):
+        # Los recortes y el índice ya están en la tabla y los metadatos del paquete
+        return metadata_digest(data)
+
+    def previous_frame(self, digest):
+        index = self.previous.find_digest(digest) if self.previous is not None else None
+        return self.previous[index] if index is not None else None
+
+    def outputs(self, frames):
+        return {self.path: self.writer.digest()} if self.writer is not None else {}
+
+    def location(self, name):
+        return f"{self.path}:{name}"
+
+    def describe(self):
+        return self.path
+
+    def close(self):
+        # Si el contenido no cambió se conserva el paquete anterior
+        unchanged = self.previous is not None and self.previous.digest() == self.writer.digest()
+        self._close_previous()
+        if self.writer is not None:
+            if unchanged:
+                self.writer.abort()
+            else:
+                self.writer.close()
+
+    def abort(self):
+        self._close_previous()
+        if self.writer is not None:
+            self.writer.abort()
+
+    def _close_previous(self):
+        if self.previous is not None:
+            self.previous.close()
+            self.previous = None
+
+def open_sink(target=DEFAULT_OUTPUT_DIR):
+    """Sink según el destino: .zip, .tar, .tar.gz/.tgz, .fpack o, si no, una carpeta"""
+    lower = target.lower()
+    if lower.endswith(('.zip', '.tar', '.tar.gz', '.tgz')):
+        return ArchiveSink(target)
+    if lower.endswith(PACK_SUFFIX):
+        return PackSink(target)
+    return DirectorySink(target)
@@ -0,0 +1,523 @@
+import os
+import json
+import time
+import argparse
+from xml.dom import minidom
+from xml.etree import ElementTree as ET
+from PIL import Image
+from frame_analysis import trim_frame
+from frame_metadata import frame_key, load_trim_metadata
+
+# Extensiones de imagen que se empaquetan
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tga', '.webp', '.qoi')
+
+# Algoritmos de empaquetado disponibles
+PACK_ALGORITHMS = ['maxrects', 'skyline']
+
+class MaxRectsBin:
+    """
+    Página de atlas con el algoritmo MaxRects (Best Short Side Fit)
+
+    Mantiene la lista de rectángulos libres máximos. Al colocar un frame solo se
+    dividen los rectángulos que lo intersecan, y solo esos fragmentos nuevos se
+    comparan para eliminar los contenidos en otros.
+    """
+
+    def __init__(self, width, height, allow_rotation=False):
+        self.width = width
+        self.height = height
+        self.allow_rotation = allow_rotation
+        self.free_rects = [(0, 0, width, height)]
+        # Mayor ancho y alto libres: descartan en O(1) los frames que no caben
+        self.max_free_width = width
+        self.max_free_height = height
+
+    def find_position(self, width, height):
+        """Retorna (x, y, rotated) con el mejor ajuste, o None si no cabe"""
+        orientations = [(width, height, False)]
+        if self.allow_rotation and width != height:
+            orientations.append((height, width, True))
+
+        best = None
+        best_short = best_long = None
+
+        for w, h, rotated in orientations:
+            if w > self.max_free_width or h > self.max_free_height:
+                continue
+
+            for fx, fy, fw, fh in self.free_rects:
+                if w <= fw and h <= fh:
+                    leftover_w = fw - w
+                    leftover_h = fh - h
+                    if leftover_w < leftover_h:
+                        short_side, long_side = leftover_w, leftover_h
+                    else:
+                        short_side, long_side = leftover_h, leftover_w
+                    if best is None or short_side < best_short or (short_side == best_short
+                                                                   and long_side < best_long):
+                        best = (fx, fy, rotated)
+                        best_short, best_long = short_side, long_side
+                        if long_side == 0:
+                            # Encaje perfecto: no hay un candidato mejor
+                            return best
+
+        return best
+
+    def place(self, x, y, width, height):
+        """Ocupa el rectángulo indicado y actualiza los rectángulos libres"""
+        kept = []
+        touching = []
+        created = []
+        right = x + width
+        bottom = y + height
+        max_width = max_height = 0
+
+        for rect in self.free_rects:
+            fx, fy, fw, fh = rect
+            if x >= fx + fw or right <= fx or y >= fy + fh or bottom <= fy:
+                kept.append(rect)
+                if fw > max_width:
+                    max_width = fw
+                if fh > max_height:
+                    max_height = fh
+                # Solo un rectángulo que toca el borde del frame colocado puede
+                # contener a alguno de los fragmentos nuevos
+                if not (x > fx + fw or right < fx or y > fy + fh or bottom < fy):
+                    touching.append(rect)
+                continue
+
+            # Dividir el rectángulo libre en hasta cuatro fragmentos máximos
+            if x > fx:
+                created.append((fx, fy, x - fx, fh))
+            if right < fx + fw:
+                created.append((right, fy, fx + fw - right, fh))
+            if y > fy:
+                created.append((fx, fy, fw, y - fy))
+            if bottom < fy + fh:
+                created.append((fx, bottom, fw, fy + fh - bottom))
+
+        # Los rectángulos intactos no pueden estar contenidos en los fragmentos
+        # nuevos; basta con descartar los fragmentos contenidos en otro rectángulo
+        survivors = []
+        for i, rect in enumerate(created):
+            if not (_contained_in_any(rect, survivors) or _contained_in_any(rect, created[i + 1:])
+                    or _contained_in_any(rect, touching)):
+                survivors.append(rect)
+                if rect[2] > max_width:
+                    max_width = rect[2]
+                if rect[3] > max_height:
+                    max_height = rect[3]
+
+        self.free_rects = kept + survivors
+        self.max_free_width = max_width
+        self.max_free_height = max_height
+
+class SkylineBin:
+    """Página de atlas con el algoritmo Skyline (Bottom-Left)"""
+
+    def __init__(self, width, height, allow_rotation=False):
+        self.width = width
+        self.height = height
+        self.allow_rotation = allow_rotation
+        # Segmentos del horizonte: (x, y, ancho)
+        self.skyline = [(0, 0, width)]
+
+    def _fit(self, index, width, height):
+        """Altura a la que cabe un rectángulo empezando en el segmento index"""
+        x = self.skyline[index][0]
+        if x + width > self.width:
+            return None
+
+        remaining = width
+        y = 0
+        while remaining > 0:
+            if index >= len(self.skyline):
+                return None
+            y = max(y, self.skyline[index][1])
+            if y + height > self.height:
+                return None
+            remaining -= self.skyline[index][2]
+            index += 1
+        return y
+
+    def find_position(self, width, height):
+        """Retorna (x, y, rotated) con el mejor ajuste, o None si no cabe"""
+        best = None
+        best_key = None
+
+        for index, (x, _, _) in enumerate(self.skyline):
+            for w, h, rotated in ((width, height, False), (height, width, True)):
+                if rotated and (not self.allow_rotation or width == height):
+                    continue
+                y = self._fit(index, w, h)
+                if y is not None and (best is None or (y + h, x) < best_key):
+                    best = (x, y, rotated)
+                    best_key = (y + h, x)
+
+        return best
+
+    def place(self, x, y, width, height):
+        """Ocupa el rectángulo indicado y actualiza el horizonte"""
+        right = x + width
+        updated = []
+        for sx, sy, sw in self.skyline:
+            s_right = sx + sw
+            if s_right <= x or sx >= right:
+                updated.append((sx, sy, sw))
+                continue
+            # Conservar las partes del segmento que quedan fuera del rectángulo
+            if sx < x:
+                updated.append((sx, sy, x - sx))
+            if s_right > right:
+                updated.append((right, sy, s_right - right))
+
+        updated.append((x, y + height, width))
+        updated.sort()
+
+        # Unir segmentos contiguos a la misma altura
+        merged = [updated[0]]
+        for sx, sy, sw in updated[1:]:
+            px, py, pw = merged[-1]
+            if py == sy and px + pw == sx:
+                merged[-1] = (px, py, pw + sw)
+            else:
+                merged.append((sx, sy, sw))
+        self.skyline = merged
+
+def _contained_in_any(inner, rects):
+    """Verifica si algún rectángulo de rects contiene completamente a inner"""
+    ix, iy, iw, ih = inner
+    right = ix + iw
+    bottom = iy + ih
+    for ox, oy, ow, oh in rects:
+        if ox <= ix and oy <= iy and right <= ox + ow and bottom <= oy + oh:
+            return True
+    return False
+
+def next_power_of_two(value):
+    """Menor potencia de dos mayor o igual que value"""
+    power = 1
+    while power < value:
+        power *= 2
+    return power
+
+def load_frames(input_dir, trim=True):
+    """
+    Carga los frames de un directorio (incluidas subcarpetas, como 'sprites/')
+
+    Cada frame se nombra con su ruta relativa usando '/' como separador. Si los
+    frames ya se recortaron al dividir la hoja (--trim), se usan el tamaño y la
+    posición originales de sus archivos de recorte.
+    """
+    trim_metadata = load_trim_metadata(input_dir)
+    frames = []
+    for root, dirs, files in os.walk(input_dir):
+        dirs.sort()
+        for filename in sorted(files):
+            if os.path.splitext(filename)[1].lower() not in IMAGE_EXTENSIONS:
+                continue
+
+            path = os.path.join(root, filename)
+            with Image.open(path) as img:
+                image = img.convert('RGBA')
+
+            name = frame_key(path, input_dir)
+            source_size = image.size
+            offset = (0, 0)
+            if trim:
+                image, offset = trim_frame(image)
+
+            if name in trim_metadata:
+                # Frame recortado al dividir: el offset es relativo a la celda original
+                entry = trim_metadata[name]
+                source_size = (entry['sourceSize']['w'], entry['sourceSize']['h'])
+                offset = (offset[0] + entry['spriteSourceSize']['x'],
+                          offset[1] + entry['spriteSourceSize']['y'])
+
+            frames.append({
+                'name': name,
+                'image': image,
+                'source_size': source_size,
+                'offset': offset
+            })
+    return frames
+
+def pack_frames(frames, max_size=2048, padding=2, allow_rotation=False,
+                algorithm='maxrects', power_of_two=True):
+    """
+    Reparte los frames en páginas de atlas
+
+    Args:
+        frames: Lista de frames (ver load_frames)
+        max_size: Tamaño máximo de cada página (ancho y alto)
+        padding: Píxeles de separación entre frames
+        allow_rotation: Permitir rotar frames 90° para aprovechar mejor el espacio
+        algorithm: 'maxrects' o 'skyline'
+        power_of_two: Ajustar cada página a dimensiones potencia de dos
+
+    Returns:
+        Lista de páginas con 'width', 'height' y 'placements'
+        (cada colocación tiene 'frame', 'x', 'y' y 'rotated')
+    """
+    if algorithm not in PACK_ALGORITHMS:
+        raise ValueError(f"Algoritmo de empaquetado desconocido: {algorithm}")
+    bin_class = MaxRectsBin if algorithm == 'maxrects' else SkylineBin
+
+    # Colocar primero los frames más grandes mejora el aprovechamiento
+    ordered = sorted(frames, key=lambda f: (max(f['image'].size), f['image'].size[0] * f['image'].size[1]),
+                     reverse=True)
+
+    pages = []
+    for frame in ordered:
+        width = frame['image'].size[0] + padding
+        height = frame['image'].size[1] + padding
+        if max(width, height) > max_size + padding:
+            raise ValueError(f"El frame {frame['name']} no cabe en una página de {max_size}x{max_size}")
+
+        for page in pages:
+            position = page['bin'].find_position(width, height)
+            if position:
+                break
+        else:
+            page = {'bin': bin_class(max_size + padding, max_size + padding, allow_rotation),
+                    'placements': []}
+            pages.append(page)
+            position = page['bin'].find_position(width, height)
+            if position is None:
+                raise ValueError(f"El frame {frame['name']} no cabe en una página de {max_size}x{max_size}")
+
+        x, y, rotated = position
+        if rotated:
+            page['bin'].place(x, y, height, width)
+        else:
+            page['bin'].place(x, y, width, height)
+        page['placements'].append({'frame': frame, 'x': x, 'y': y, 'rotated': rotated})
+
+    for page in pages:
+        del page['bin']
+        if power_of_two:
+            _shrink_page(page, bin_class, max_size, padding, allow_rotation)
+
+        # Ajustar cada página al área usada
+        used_width = used_height = 1
+        for placement in page['placements']:
+            w, h = placement['frame']['image'].size
+            if placement['rotated']:
+                w, h = h, w
+            used_width = max(used_width, placement['x'] + w)
+            used_height = max(used_height, placement['y'] + h)
+
+        if power_of_two:
+            used_width, used_height = next_power_of_two(used_width), next_power_of_two(used_height)
+        page['width'] = used_width
+        page['height'] = used_height
+
+    return pages
+
+def _shrink_page(page, bin_class, max_size, padding, allow_rotation):
+    """
+    Reempaqueta una página en la menor página potencia de dos donde caben sus frames
+
+    Se prueban los tamaños de menor a mayor área, empezando por el área mínima
+    que ocupan los frames, así que las páginas llenas apenas se recalculan.
+    """
+    frames = [placement['frame'] for placement in page['placements']]
+    sizes = [(f['image'].size[0] + padding, f['image'].size[1] + padding) for f in frames]
+    min_area = sum(w * h for w, h in sizes)
+
+    candidates = []
+    side = 1
+    while side <= max_size:
+        other = 1
+        while other <= max_size:
+            if side * other >= min_area:
+                candidates.append((side * other, abs(side - other), side, other))
+            other *= 2
+        side *= 2
+
+    for _, _, width, height in sorted(candidates):
+        if (width, height) == (max_size, max_size):
+            break
+        packer = bin_class(width + padding, height + padding, allow_rotation)
+        placements = []
+        for frame, (w, h) in zip(frames, sizes):
+            position = packer.find_position(w, h)
+            if position is None:
+                break
+            x, y, rotated = position
+            packer.place(x, y, *((h, w) if rotated else (w, h)))
+            placements.append({'frame': frame, 'x': x, 'y': y, 'rotated': rotated})
+        else:
+            page['placements'] = placements
+            return
+
+def render_page(page):
+    """Compone la imagen RGBA de una página del atlas"""
+    atlas = Image.new('RGBA', (page['width'], page['height']), (0, 0, 0, 0))
+    for placement in page['placements']:
+        image = placement['frame']['image']
+        if placement['rotated']:
+            # Rotación de 90° en sentido horario (convención de TexturePacker)
+            image = image.transpose(Image.Transpose.ROTATE_270)
+        atlas.paste(image, (placement['x'], placement['y']))
+    return atlas
+
+def build_json(pages, page_files, padding):
+    """Mapa de coordenadas en formato JSON (estilo TexturePacker 'JSON Hash')"""
+    frames = {}
+    for page_index, page in enumerate(pages):
+        for placement in page['placements']:
+            frame = placement['frame']
+            w, h = frame['image'].size
+            atlas_w, atlas_h = (h, w) if placement['rotated'] else (w, h)
+            frames[frame['name']] = {
+                'page': page_index,
+                'frame': {'x': placement['x'], 'y': placement['y'], 'w': atlas_w, 'h': atlas_h},
+                'rotated': placement['rotated'],
+                'trimmed': (w, h) != frame['source_size'],
+                'spriteSourceSize': {'x': frame['offset'][0], 'y': frame['offset'][1], 'w': w, 'h': h},
+                'sourceSize': {'w': frame['source_size'][0], 'h': frame['source_size'][1]}
+            }
+
+    return {
+        'frames': dict(sorted(frames.items())),
+        'meta': {
+            'app': 'Sprite-Sheet-Splitter',
+            'format': 'RGBA8888',
+            'padding': padding,
+            'pages': [{'image': os.path.basename(page_file), 'size': {'w': page['width'], 'h': page['height']}}
+                      for page, page_file in zip(pages, page_files)]
+        }
+    }
+
+def build_xml(page, page_file):
+    """Mapa de coordenadas de una página en formato XML (Starling / Sparrow)"""
+    root = ET.Element('TextureAtlas', imagePath=os.path.basename(page_file))
+    for placement in sorted(page['placements'], key=lambda p: p['frame']['name']):
+        frame = placement['frame']
+        w, h = frame['image'].size
+        attributes = {
+            'name': frame['name'],
+            'x': str(placement['x']),
+            'y': str(placement['y']),
+            'width': str(h if placement['rotated'] else w),
+            'height': str(w if placement['rotated'] else h),
+            'frameX': str(-frame['offset'][0]),
+            'frameY': str(-frame['offset'][1]),
+            'frameWidth': str(frame['source_size'][0]),
+            'frameHeight': str(frame['source_size'][1])
+        }
+        if placement['rotated']:
+            attributes['rotated'] = 'true'
+        ET.SubElement(root, 'SubTexture', attributes)
+
+    return minidom.parseString(ET.tostring(root)).toprettyxml(indent='  ')
+
+def pack_atlas(input_dir, output="atlas/atlas", max_size=2048, padding=2, allow_rotation=False,
+               trim=True, algorithm='maxrects', power_of_two=True, data_format='json'):
+    """
+    Empaqueta los frames de un directorio en páginas de atlas + mapa de coordenadas
+
+    Es la operación inversa de split_spritesheet: toma por ejemplo la carpeta
+    'sprites/' y genera output_0.png, output_1.png... junto con output.json
+    y/o output_N.xml.
+
+    Returns:
+        Diccionario con 'frames', 'pages' (rutas de las imágenes), 'data' (rutas de
+        los mapas) y 'error' (None si todo fue bien)
+    """
+    result = {'frames': 0, 'pages': [], 'data': [], 'error': None}
+
+    if not os.path.isdir(input_dir):
+        print(f"❌ Error: El directorio {input_dir} no existe")
+        result['error'] = f"El directorio {input_dir} no existe"
+        return result
+
+    try:
+        start = time.time()
+        frames = load_frames(input_dir, trim)
+        if not frames:
+            print(f"❌ No se encontraron frames en {input_dir}")
+            result['error'] = f"No se encontraron frames en {input_dir}"
+            return result
+
+        print(f"🖼️  Frames cargados: {len(frames)}")
+        pages = pack_frames(frames, max_size, padding, allow_rotation, algorithm, power_of_two)
+        print(f"📦 Empaquetado ({algorithm}): {len(pages)} página(s) en {time.time() - start:.2f}s")
+
+        output_dir = os.path.dirname(output)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        page_files = [f"{output}_{index}.png" for index in range(len(pages))]
+        for page, page_file in zip(pages, page_files):
+            render_page(page).save(page_file, 'PNG')
+            print(f"💾 {page_file} ({page['width']}x{page['height']}, {len(page['placements'])} frames)")
+
+        if data_format in ('json', 'both'):
+            data_file = f"{output}.json"
+            with open(data_file, 'w', encoding='utf-8') as f:
+                json.dump(build_json(pages, page_files, padding), f, indent=2)
+            result['data'].append(data_file)
+            print(f"📋 {data_file}")
+
+        if data_format in ('xml', 'both'):
+            for page, page_file in zip(pages, page_files):
+                data_file = f"{os.path.splitext(page_file)[0]}.xml"
+                with open(data_file, 'w', encoding='utf-8') as f:
+                    f.write(build_xml(page, page_file))
+                result['data'].append(data_file)
+                print(f"📋 {data_file}")
+
+        result['frames'] = len(frames)
+        result['pages'] = page_files
+        print(f"\n🎉 Atlas completado: {len(frames)} frames en {len(pages)} página(s)")
+
+    except Exception as e:
+        print(f"❌ Error al empaquetar el atlas: {e}")
+        result['error'] = str(e)
+
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Empaqueta frames individuales en páginas de texture atlas',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Ejemplos de uso:
+  # Empaquetar la carpeta generada por split_spritesheet
+  python pack_atlas.py sprites --output atlas/game
+
+  # Páginas de 1024, rotación permitida y mapas JSON + XML
+  python pack_atlas.py sprites --output atlas/game --max-size 1024 --rotate --data both
+        '''
+    )
+
+    parser.add_argument('input', help='Directorio con los frames (ej: sprites)')
+    parser.add_argument('--output', default='atlas/atlas', help='Ruta base de salida (por defecto: atlas/atlas)')
+    parser.add_argument('--max-size', type=int, default=2048, help='Tamaño máximo de página (por defecto: 2048)')
+    parser.add_argument('--padding', type=int, default=2, help='Separación entre frames en píxeles (por defecto: 2)')
+    parser.add_argument('--rotate', action='store_true', help='Permitir rotar frames 90°')
+    parser.add_argument('--no-trim', action='store_true', help='No recortar la transparencia de los frames')
+    parser.add_argument('--algorithm', default='maxrects', choices=PACK_ALGORITHMS,
+                       help='Algoritmo de empaquetado (por defecto: maxrects)')
+    parser.add_argument('--no-pot', action='store_true', help='No ajustar las páginas a potencias de dos')
+    parser.add_argument('--data', default='json', choices=['json', 'xml', 'both'],
+                       help='Formato del mapa de coordenadas (por defecto: json)')
+
+    args = parser.parse_args()
+
+    pack_atlas(
+        args.input,
+        args.output,
+        args.max_size,
+        args.padding,
+        args.rotate,
+        not args.no_trim,
+        args.algorithm,
+        not args.no_pot,
+        args.data
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import os
+import glob
+import mmap
+from PIL import Image
+from frame_analysis import map_pixels
+from manifest import file_digest
+
+# Carpeta por defecto de la caché de píxeles decodificados
+DEFAULT_CACHE_DIR = '.pixel_cache'
+
+# Hojas que se guardan en la caché: se conservan más recientes (por uso)
+MAX_CACHE_ENTRIES = 8
+
+# Modos cuyo buffer crudo basta para reconstruir la imagen (sin paleta ni
+# color transparente en los metadatos), de modo que los frames no cambian
+CACHE_MODES = {'L': 1, 'LA': 2, 'RGB': 3, 'RGBA': 4}
+
+def cache_path(cache_dir, digest, mode, size):
+    """Ruta del buffer crudo de una hoja: hash del contenido, modo y tamaño"""
+    return os.path.join(cache_dir, f"{digest}_{mode}_{size[0]}x{size[1]}.raw")
+
+def open_cached_sheet(input_file, cache_dir=DEFAULT_CACHE_DIR, digest=None):
+    """
+    Abre una hoja usando la caché de píxeles decodificados
+
+    Si la hoja (identificada por el hash de su contenido) ya está en la caché, el
+    buffer crudo se mapea en memoria y se envuelve con map_pixels sin copiarlo
+    ni volver a descomprimir el PNG (tampoco al exponerlo como array NumPy);
+    varios procesos que dividen la misma hoja comparten esas páginas. Si no está, se decodifica y se guarda.
+
+    Returns:
+        (imagen, hash del archivo, True si se leyó de la caché)
+    """
+    digest = digest or file_digest(input_file)
+
+    for path in glob.glob(os.path.join(cache_dir, f"{digest}_*.raw")):
+        image = _map_cached(path)
+        if image is not None:
+            os.utime(path)
+            return image, digest, True
+
+    image = Image.open(input_file)
+    image.load()
+    if image.mode in CACHE_MODES and 'transparency' not in image.info:
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_cached(image, cache_path(cache_dir, digest, image.mode, image.size))
+        prune_cache(cache_dir)
+    return image, digest, False
+
+def _map_cached(path):
+    """Imagen de solo lectura sobre el buffer mapeado; None si el archivo no es válido"""
+    try:
+        _, mode, size = os.path.splitext(os.path.basename(path))[0].rsplit('_', 2)
+        width, height = (int(value) for value in size.split('x'))
+        if os.path.getsize(path) != width * height * CACHE_MODES[mode]:
+            return None
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, KeyError):
+        return None
+    return map_pixels(mode, (width, height), buffer)
+
+def _write_cached(image, path, rows_per_chunk=256):
+    """Guarda el buffer crudo por tramos de filas (sin duplicar la hoja en memoria)"""
+    temp_path = f"{path}.tmp"
+    width, height = image.size
+    with open(temp_path, 'wb') as f:
+        for upper in range(0, height, rows_per_chunk):
+            f.write(image.crop((0, upper, width, min(height, upper + rows_per_chunk))).tobytes())
+    os.replace(temp_path, path)
+
+def prune_cache(cache_dir, keep=MAX_CACHE_ENTRIES):
+    """Elimina las hojas usadas hace más tiempo cuando la caché supera keep entradas"""
+    entries = sorted(glob.glob(os.path.join(cache_dir, '*.raw')), key=os.path.getmtime, reverse=True)
+    for path in entries[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -1,20 +1,19 @@
 from PIL import Image
 import os
-import glob
+from image_discovery import find_images
+from image_probe import probe_images
 
 def mostrar_imagenes_directorio():
     """Muestra todas las imágenes en el directorio actual"""
     # Extensiones de imagen comunes
-    extensiones = ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.bmp', '*.tiff', '*.webp']
+    extensiones = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp')
     
     print("\n" + "="*60)
     print("IMÁGENES DISPONIBLES EN EL DIRECTORIO ACTUAL")
     print("="*60)
     
-    imagenes = []
-    for extension in extensiones:
-        imagenes.extend(glob.glob(extension))
-        imagenes.extend(glob.glob(extension.upper()))  # Para extensiones en mayúsculas
+    # Una sola lectura del directorio; las extensiones no distinguen mayúsculas
+    imagenes = find_images('.', extensiones)
     
     if not imagenes:
         print("❌ No se encontraron imágenes en el directorio actual.")
@@ -25,13 +24,12 @@ def mostrar_imagenes_directorio():
     print(f"📊 Total de imágenes encontradas: {len(imagenes)}")
     print("-"*60)
     
-    for i, imagen in enumerate(imagenes, 1):
-        try:
-            with Image.open(imagen) as img:
-                ancho, alto = img.size
-                tamano_kb = os.path.getsize(imagen) / 1024
-                print(f"{i:2d}. {imagen:30} → {ancho:4d} x {alto:4d} px ({tamano_kb:.1f} KB)")
-        except:
+    # Solo las cabeceras, en paralelo y con caché (ver image_probe)
+    for i, (imagen, info) in enumerate(zip(imagenes, probe_images(imagenes)), 1):
+        if info:
+            tamano_kb = info['file_size'] / 1024
+            print(f"{i:2d}. {imagen:30} → {info['width']:4d} x {info['height']:4d} px ({tamano_kb:.1f} KB)")
+        else:
             print(f"{i:2d}. {imagen:30} → ERROR al leer la imagen")
     
     print("="*60)
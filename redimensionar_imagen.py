@@ -1,6 +1,11 @@
-from PIL import Image
+from PIL import Image, ImageFilter
 import os
+import sys
 import glob
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from image_discovery import find_images
+from image_probe import probe_images
 import time
 
 # Diccionario de algoritmos disponibles con sus descripciones
@@ -19,6 +24,16 @@ ALGORITMOS = {
           'descripcion': 'Suavizado avanzado.'}
 }
 
+# Algoritmos que suavizan al reducir y admiten el filtro de enfoque posterior
+ALGORITMOS_CON_ENFOQUE = ('2', '4')  # BOX y HAMMING
+
+# Extensiones de las imágenes que se listan y se buscan en las carpetas
+EXTENSIONES = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp')
+
+# Nombre de los archivos redimensionados: {nombre} y {ext} son los del original,
+# {ancho} y {alto} los pedidos ('auto' si se calculan manteniendo la proporción)
+PATRON_SALIDA = '{nombre}_{algoritmo}_{ancho}x{alto}{ext}'
+
 def mostrar_menu_algoritmos():
     """Muestra menú para seleccionar algoritmo de redimensionamiento"""
     print("\n🎨 ALGORITMOS DE REDIMENSIONAMIENTO")
@@ -45,11 +60,11 @@ def mostrar_menu_algoritmos():
         else:
             print("❌ Opción no válida. Intenta nuevamente.")
 
-def algoritmo_recomendado(tipo_imagen, es_reduccion_grande):
-    """Recomienda algoritmo según tipo de imagen y reducción"""
-    print("\n🤖 RECOMENDACIÓN AUTOMÁTICA")
-    print("-"*70)
-    
+def algoritmo_recomendado(tipo_imagen, es_reduccion_grande, confirmar=True):
+    """
+    Recomienda algoritmo según tipo de imagen y reducción
+    Con confirmar=False se retorna la recomendación sin mostrarla ni preguntar
+    """
     if tipo_imagen in ['pixel', 'logo', 'texto']:
         recomendacion = '1'  # NEAREST
         razon = "Imágenes con bordes definidos y colores planos"
@@ -60,6 +75,11 @@ def algoritmo_recomendado(tipo_imagen, es_reduccion_grande):
         recomendacion = '4'  # HAMMING
         razon = "Reducción moderada manteniendo detalles"
     
+    if not confirmar:
+        return recomendacion
+    
+    print("\n🤖 RECOMENDACIÓN AUTOMÁTICA")
+    print("-"*70)
     print(f"Para tu caso, recomiendo: {ALGORITMOS[recomendacion]['nombre']}")
     print(f"Razón: {razon}")
     print(f"Descripción: {ALGORITMOS[recomendacion]['descripcion']}")
@@ -70,8 +90,14 @@ def algoritmo_recomendado(tipo_imagen, es_reduccion_grande):
     else:
         return mostrar_menu_algoritmos()
 
-def detectar_tipo_imagen(ruta_imagen):
-    """Intenta detectar el tipo de imagen para recomendación"""
+def detectar_tipo_imagen(ruta_imagen, modo=None):
+    """
+    Intenta detectar el tipo de imagen para recomendación
+    Con modo (por ejemplo, leído de la cabecera) no se abre la imagen
+    """
+    if modo is not None:
+        return 'pixel' if modo in ['P', 'L'] else 'general'
+    
     try:
         with Image.open(ruta_imagen) as img:
             # Análisis simple basado en modo de color y tamaño
@@ -83,24 +109,32 @@ def detectar_tipo_imagen(ruta_imagen):
     except:
         return 'general'
 
-def redimensionar_con_algoritmo(ruta_entrada, ruta_salida, ancho, alto, algoritmo_key):
-    """Redimensiona una imagen usando un algoritmo específico"""
+def redimensionar_con_algoritmo(ruta_entrada, ruta_salida, ancho, alto, algoritmo_key,
+                                enfoque=None, mostrar=True):
+    """
+    Redimensiona una imagen usando un algoritmo específico
+    
+    enfoque indica si se aplica un filtro de enfoque suave tras BOX o HAMMING;
+    con None se pregunta. Con mostrar=False no se imprime nada (workers del pool).
+    """
     try:
         with Image.open(ruta_entrada) as img:
             algoritmo = ALGORITMOS[algoritmo_key]
             
-            print(f"\n🔄 Redimensionando con {algoritmo['nombre']}...")
+            if mostrar:
+                print(f"\n🔄 Redimensionando con {algoritmo['nombre']}...")
             tiempo_inicio = time.time()
             
             img_redimensionada = img.resize((ancho, alto), algoritmo['constante'])
             
             # Posprocesamiento opcional: enfoque ligero
-            if algoritmo_key in ['2', '4']:  # Solo para BOX y HAMMING
-                aplicar_enfoque = input("¿Aplicar filtro de enfoque suave para más nitidez? (sí/no): ").strip().lower()
-                if aplicar_enfoque in ['sí', 'si', 's', 'yes', 'y']:
-                    from PIL import ImageFilter
+            if algoritmo_key in ALGORITMOS_CON_ENFOQUE:
+                if enfoque is None:
+                    enfoque = preguntar_enfoque()
+                if enfoque:
                     img_redimensionada = img_redimensionada.filter(ImageFilter.SHARPEN)
-                    print("   ✓ Filtro de enfoque aplicado")
+                    if mostrar:
+                        print("   ✓ Filtro de enfoque aplicado")
             
             # Calcular relación de aspecto original vs nuevo
             ancho_orig, alto_orig = img.size
@@ -127,6 +161,11 @@ def redimensionar_con_algoritmo(ruta_entrada, ruta_salida, ancho, alto, algoritm
             'error': str(e)
         }
 
+def preguntar_enfoque():
+    """Pregunta si se aplica el filtro de enfoque suave tras BOX o HAMMING"""
+    respuesta = input("¿Aplicar filtro de enfoque suave para más nitidez? (sí/no): ").strip().lower()
+    return respuesta in ['sí', 'si', 's', 'yes', 'y']
+
 def comparar_algoritmos(ruta_imagen, ancho, alto):
     """Crea versiones con todos los algoritmos para comparar"""
     print("\n🔬 CREANDO VERSIÓN CON CADA ALGORITMO")
@@ -163,12 +202,7 @@ def comparar_algoritmos(ruta_imagen, ancho, alto):
 
 def mostrar_imagenes_directorio():
     """Muestra imágenes disponibles en el directorio actual"""
-    extensiones = ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.bmp', '*.tiff', '*.webp']
-    imagenes = []
-    
-    for ext in extensiones:
-        imagenes.extend(glob.glob(ext))
-        imagenes.extend(glob.glob(ext.upper()))
+    imagenes = find_images('.', EXTENSIONES)
     
     if not imagenes:
         print("\n❌ No se encontraron imágenes.")
@@ -178,15 +212,13 @@ def mostrar_imagenes_directorio():
     print(f"📊 Imágenes encontradas: {len(imagenes)}")
     print("-"*70)
     
-    for i, img in enumerate(imagenes, 1):
-        try:
-            with Image.open(img) as img_obj:
-                ancho, alto = img_obj.size
-                tamano_kb = os.path.getsize(img) / 1024
-                modo = img_obj.mode
-                print(f"{i:3d}. {os.path.basename(img):30} {ancho:4d}x{alto:<4d} "
-                      f"{modo:5} {tamano_kb:7.1f} KB")
-        except:
+    # Solo las cabeceras, en paralelo y con caché (ver image_probe)
+    for i, (img, info) in enumerate(zip(imagenes, probe_images(imagenes)), 1):
+        if info:
+            tamano_kb = info['file_size'] / 1024
+            print(f"{i:3d}. {os.path.basename(img):30} {info['width']:4d}x{info['height']:<4d} "
+                  f"{info['mode']:5} {tamano_kb:7.1f} KB")
+        else:
             print(f"{i:3d}. {os.path.basename(img):30} ERROR al leer")
     
     return imagenes
@@ -262,26 +294,56 @@ def obtener_dimensiones():
         except ValueError:
             print("❌ Ingresa solo números válidos")
 
-def procesar_imagenes(imagenes, ancho, alto, algoritmo_seleccionado):
-    """Procesa todas las imágenes seleccionadas"""
-    resultados = []
+def procesar_imagenes(imagenes, ancho, alto, algoritmo_seleccionado, enfoque=None,
+                      carpeta_salida=None, patron=PATRON_SALIDA, jobs=1):
+    """
+    Procesa todas las imágenes seleccionadas
+    
+    Primero se decide, para cada imagen, el algoritmo, el tamaño final y la ruta
+    de salida (los tamaños se leen de las cabeceras, en paralelo). Las preguntas
+    (recomendación o enfoque sin indicar) se hacen en esta fase; después las
+    imágenes se redimensionan sin interrupciones, en un pool de procesos si
+    jobs != 1 (0 = todos los núcleos).
+    
+    Args:
+        algoritmo_seleccionado: Clave de ALGORITMOS, 'RECOMENDAR' (pregunta por
+                                imagen), 'AUTO' (recomendación sin preguntar) o 'COMPARAR'
+        enfoque: Aplicar el enfoque suave tras BOX o HAMMING (None: preguntar una vez)
+        carpeta_salida: Carpeta de los archivos redimensionados (por defecto: la del original),
+                        con las subcarpetas de las imágenes relativas a su carpeta común
+        patron: Nombre de los archivos redimensionados (ver PATRON_SALIDA)
+    
+    Returns:
+        Un resultado por imagen, en el mismo orden
+    """
+    resultados = [None] * len(imagenes)
+    tareas = []
+    
+    # Con carpeta de salida se conservan las subcarpetas relativas a la carpeta
+    # común de las imágenes ('in/sub/a.png' -> 'salida/sub/a_...png')
+    base = None
+    if carpeta_salida is not None and imagenes:
+        base = os.path.commonpath([os.path.dirname(os.path.abspath(ruta)) for ruta in imagenes])
     
-    for i, ruta_imagen in enumerate(imagenes, 1):
-        print(f"\n{'='*70}")
-        print(f"🖼️  PROCESANDO {i}/{len(imagenes)}: {os.path.basename(ruta_imagen)}")
-        print(f"{'='*70}")
+    for i, (ruta_imagen, info) in enumerate(zip(imagenes, probe_images(imagenes, cache_file=None))):
+        if info is None:
+            print(f"\n❌ ERROR: No se pudo leer {ruta_imagen}")
+            resultados[i] = {'exito': False, 'error': f"No se pudo leer {ruta_imagen}"}
+            continue
         
         # Detectar tipo de imagen para recomendaciones
-        tipo = detectar_tipo_imagen(ruta_imagen)
+        tipo = detectar_tipo_imagen(ruta_imagen, info['mode'])
         
         # Determinar si es reducción grande
-        with Image.open(ruta_imagen) as img:
-            ancho_orig, alto_orig = img.size
-            es_reduccion_grande = (ancho and ancho < ancho_orig * 0.5) or (alto and alto < alto_orig * 0.5)
+        ancho_orig, alto_orig = info['width'], info['height']
+        es_reduccion_grande = (ancho and ancho < ancho_orig * 0.5) or (alto and alto < alto_orig * 0.5)
         
         # Seleccionar algoritmo final
         if algoritmo_seleccionado == 'RECOMENDAR':
+            print(f"\n🖼️  {os.path.basename(ruta_imagen)}")
             algoritmo_final = algoritmo_recomendado(tipo, es_reduccion_grande)
+        elif algoritmo_seleccionado == 'AUTO':
+            algoritmo_final = algoritmo_recomendado(tipo, es_reduccion_grande, confirmar=False)
         else:
             algoritmo_final = algoritmo_seleccionado
         
@@ -289,13 +351,23 @@ def procesar_imagenes(imagenes, ancho, alto, algoritmo_seleccionado):
             comparar_algoritmos(ruta_imagen, 
                                ancho or int(ancho_orig * 0.5), 
                                alto or int(alto_orig * 0.5))
-            resultados.append({'comparacion': True})
+            resultados[i] = {'comparacion': True}
             continue
         
-        # Procesar imagen individual
-        nombre, ext = os.path.splitext(ruta_imagen)
+        # Preguntar una sola vez, antes de empezar, si se aplica el enfoque
+        if enfoque is None and algoritmo_final in ALGORITMOS_CON_ENFOQUE:
+            enfoque = preguntar_enfoque()
+        
+        # Ruta de salida según el patrón
+        nombre, ext = os.path.splitext(os.path.basename(ruta_imagen))
         algoritmo_nombre = ALGORITMOS[algoritmo_final]['nombre']
-        ruta_salida = f"{nombre}_{algoritmo_nombre}_{ancho or 'auto'}x{alto or 'auto'}{ext}"
+        if base is None:
+            carpeta = os.path.dirname(ruta_imagen)
+        else:
+            relativa = os.path.relpath(os.path.dirname(os.path.abspath(ruta_imagen)), base)
+            carpeta = os.path.normpath(os.path.join(carpeta_salida, relativa))
+        ruta_salida = os.path.join(carpeta, patron.format(nombre=nombre, ext=ext, algoritmo=algoritmo_nombre,
+                                                          ancho=ancho or 'auto', alto=alto or 'auto'))
         
         # Calcular dimensiones finales si alguna es None
         ancho_final = ancho
@@ -308,22 +380,156 @@ def procesar_imagenes(imagenes, ancho, alto, algoritmo_seleccionado):
             proporcion = alto / alto_orig
             ancho_final = int(ancho_orig * proporcion)
         
-        resultado = redimensionar_con_algoritmo(ruta_imagen, ruta_salida, 
-                                              ancho_final, alto_final, algoritmo_final)
-        
-        if resultado['exito']:
-            resultados.append(resultado)
-            print(f"\n✅ ÉXITO: {os.path.basename(ruta_salida)}")
-            print(f"   Algoritmo: {resultado['algoritmo']}")
-            print(f"   De: {resultado['tamano_orig'][0]}x{resultado['tamano_orig'][1]}")
-            print(f"   A: {resultado['tamano_nuevo'][0]}x{resultado['tamano_nuevo'][1]}")
-            print(f"   Tiempo: {resultado['tiempo']:.2f}s")
-        else:
-            print(f"\n❌ ERROR: {resultado['error']}")
-            resultados.append({'error': True})
+        tareas.append((i, (ruta_imagen, ruta_salida, ancho_final, alto_final, algoritmo_final, bool(enfoque))))
+    
+    # Dos imágenes con la misma salida se sobrescribirían: no se procesa ninguna
+    salidas = {}
+    for i, tarea in tareas:
+        salidas.setdefault(os.path.normcase(os.path.abspath(tarea[1])), []).append(i)
+    repetidas = {i for indices in salidas.values() if len(indices) > 1 for i in indices}
+    for i, tarea in tareas:
+        if i in repetidas:
+            otras = [imagenes[j] for j in salidas[os.path.normcase(os.path.abspath(tarea[1]))] if j != i]
+            error = f"La salida {tarea[1]} coincide con la de {', '.join(otras)}"
+            print(f"\n❌ ERROR: {tarea[0]}: {error}")
+            resultados[i] = {'exito': False, 'error': error}
+    tareas = [(i, tarea) for i, tarea in tareas if i not in repetidas]
+    
+    for carpeta in {os.path.dirname(tarea[1]) for _, tarea in tareas}:
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+    
+    # Redimensionar sin preguntas: en serie o repartido en el pool de procesos
+    if jobs == 1 or len(tareas) <= 1:
+        procesadas = map(redimensionar_tarea, (tarea for _, tarea in tareas))
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=jobs if jobs and jobs > 0 else os.cpu_count())
+        procesadas = pool.map(redimensionar_tarea, (tarea for _, tarea in tareas))
+    
+    try:
+        for contador, ((i, tarea), resultado) in enumerate(zip(tareas, procesadas), 1):
+            resultados[i] = resultado
+            ruta_imagen, ruta_salida = tarea[:2]
+            if resultado['exito']:
+                print(f"\n✅ [{contador}/{len(tareas)}] {os.path.basename(ruta_imagen)} → {ruta_salida}")
+                print(f"   Algoritmo: {resultado['algoritmo']}"
+                      f"{' + enfoque' if resultado['enfoque'] else ''}")
+                print(f"   De: {resultado['tamano_orig'][0]}x{resultado['tamano_orig'][1]}")
+                print(f"   A: {resultado['tamano_nuevo'][0]}x{resultado['tamano_nuevo'][1]}")
+                print(f"   Tiempo: {resultado['tiempo']:.2f}s")
+            else:
+                print(f"\n❌ ERROR: {os.path.basename(ruta_imagen)}: {resultado['error']}")
+    finally:
+        if pool:
+            pool.shutdown()
     
     return resultados
 
+def redimensionar_tarea(tarea):
+    """Redimensiona una imagen del lote sin preguntas ni mensajes (se ejecuta en los workers)"""
+    ruta_entrada, ruta_salida, ancho, alto, algoritmo_key, enfoque = tarea
+    resultado = redimensionar_con_algoritmo(ruta_entrada, ruta_salida, ancho, alto, algoritmo_key,
+                                            enfoque=enfoque, mostrar=False)
+    if resultado['exito']:
+        resultado['enfoque'] = enfoque and algoritmo_key in ALGORITMOS_CON_ENFOQUE
+    return resultado
+
+def mostrar_resumen(resultados, carpeta):
+    """Muestra el resumen final de un redimensionamiento"""
+    exitos = sum(1 for r in resultados if 'exito' in r and r['exito'])
+    comparaciones = sum(1 for r in resultados if 'comparacion' in r)
+    
+    print("\n" + "="*70)
+    print("🎉 PROCESO COMPLETADO")
+    print("="*70)
+    print(f"✓ Imágenes procesadas: {len(resultados)}")
+    print(f"✓ Redimensionadas exitosamente: {exitos}")
+    if comparaciones > 0:
+        print(f"✓ Comparaciones creadas: {comparaciones}")
+    errores = len(resultados) - exitos - comparaciones
+    if errores:
+        print(f"✗ Con error: {errores}")
+    print(f"\n📁 Los archivos están en: {carpeta}")
+
+def buscar_entradas(entradas):
+    """
+    Imágenes de la línea de comandos: archivos, patrones glob (admiten '**') o
+    carpetas (sus imágenes, sin subcarpetas), sin repetir ninguna
+    """
+    imagenes = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            imagenes.extend(find_images(entrada, EXTENSIONES))
+        elif glob.has_magic(entrada):
+            imagenes.extend(sorted(ruta for ruta in glob.glob(entrada, recursive=True)
+                                   if os.path.splitext(ruta)[1].lower() in EXTENSIONES))
+        else:
+            imagenes.append(entrada)
+    return list(dict.fromkeys(os.path.normpath(ruta) for ruta in imagenes))
+
+def main():
+    """Línea de comandos; sin argumentos se abre el menú interactivo"""
+    if len(sys.argv) == 1:
+        menu_principal()
+        return 0
+    
+    nombres = {algoritmo['nombre']: key for key, algoritmo in ALGORITMOS.items()}
+    parser = argparse.ArgumentParser(
+        description='Redimensiona imágenes eligiendo el algoritmo de remuestreo',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Ejemplos de uso:
+  # Menú interactivo:
+  python redimensionar_imagen.py
+
+  # Línea de comandos:
+  python redimensionar_imagen.py sprites/*.png --width 64 --algorithm NEAREST
+  python redimensionar_imagen.py fondos/ --width 1280 --algorithm BOX --sharpen -j 4 -o reducidas
+  python redimensionar_imagen.py "arte/**/*.png" --height 256 --pattern "{nombre}@2x{ext}"
+            '''
+    )
+    parser.add_argument('inputs', nargs='+', help='Imágenes, patrones glob o carpetas')
+    parser.add_argument('--width', type=int, help='Ancho deseado (sin --height se mantiene la proporción)')
+    parser.add_argument('--height', type=int, help='Alto deseado (sin --width se mantiene la proporción)')
+    parser.add_argument('--algorithm', '-a', default='AUTO', type=str.upper, choices=list(nombres) + ['AUTO'],
+                        help='Algoritmo de remuestreo (AUTO: el recomendado para cada imagen)')
+    parser.add_argument('--sharpen', action='store_true',
+                        help='Aplicar un filtro de enfoque suave tras BOX o HAMMING')
+    parser.add_argument('--output-dir', '-o',
+                        help='Carpeta de los archivos redimensionados, con las subcarpetas de las imágenes (por defecto: la de cada original)')
+    parser.add_argument('--pattern', default=PATRON_SALIDA,
+                        help=f'Nombre de los archivos ({{nombre}}, {{ext}}, {{algoritmo}}, {{ancho}}, {{alto}}; '
+                             f'por defecto: {PATRON_SALIDA})')
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help='Imágenes a redimensionar en paralelo (0 = todos los núcleos, 1 = en serie)')
+    args = parser.parse_args()
+    
+    if not args.width and not args.height:
+        parser.error("indica --width, --height o ambos")
+    if (args.width is not None and args.width <= 0) or (args.height is not None and args.height <= 0):
+        parser.error("las dimensiones deben ser números positivos")
+    try:
+        args.pattern.format(nombre='', ext='', algoritmo='', ancho=0, alto=0)
+    except (KeyError, IndexError, ValueError) as e:
+        parser.error(f"patrón de salida inválido {args.pattern!r} ({e})")
+    
+    imagenes = buscar_entradas(args.inputs)
+    if not imagenes:
+        print("❌ No se encontraron imágenes.")
+        return 1
+    
+    algoritmo = nombres.get(args.algorithm, args.algorithm)
+    if args.sharpen and algoritmo not in ALGORITMOS_CON_ENFOQUE + ('AUTO',):
+        print(f"⚠️  --sharpen solo se aplica con BOX y HAMMING; se ignora con {args.algorithm}")
+    
+    print(f"🖼️  {len(imagenes)} imágenes → {args.width or 'auto'}x{args.height or 'auto'} ({args.algorithm})")
+    resultados = procesar_imagenes(imagenes, args.width, args.height, algoritmo, enfoque=args.sharpen,
+                                   carpeta_salida=args.output_dir, patron=args.pattern, jobs=args.jobs)
+    mostrar_resumen(resultados, args.output_dir or "carpetas de las imágenes originales")
+    
+    return 1 if any(not r.get('exito') for r in resultados) else 0
+
 def menu_principal():
     """Menú principal del programa"""
     print("\n" + "="*70)
@@ -373,19 +579,7 @@ def menu_principal():
             confirmar = input("\n¿Ejecutar redimensionamiento? (sí/no): ").strip().lower()
             if confirmar in ['sí', 'si', 's', 'yes', 'y']:
                 resultados = procesar_imagenes(seleccionadas, ancho, alto, algoritmo)
-                
-                # Mostrar resumen final
-                exitos = sum(1 for r in resultados if 'exito' in r and r['exito'])
-                comparaciones = sum(1 for r in resultados if 'comparacion' in r)
-                
-                print("\n" + "="*70)
-                print("🎉 PROCESO COMPLETADO")
-                print("="*70)
-                print(f"✓ Imágenes procesadas: {len(seleccionadas)}")
-                print(f"✓ Redimensionadas exitosamente: {exitos}")
-                if comparaciones > 0:
-                    print(f"✓ Comparaciones creadas: {comparaciones}")
-                print(f"\n📁 Los archivos están en: {os.getcwd()}")
+                mostrar_resumen(resultados, os.getcwd())
         
         elif opcion == '2':
             mostrar_imagenes_directorio()
@@ -428,8 +622,10 @@ if __name__ == "__main__":
     
     # Ejecutar programa
     try:
-        menu_principal()
+        sys.exit(main())
     except KeyboardInterrupt:
         print("\n\n⚠️  Programa interrumpido")
+        sys.exit(1)
     except Exception as e:
-        print(f"\n❌ Error inesperado: {e}")
\ No newline at end of file
+        print(f"\n❌ Error inesperado: {e}")
+        sys.exit(1)
\ No newline at end of file
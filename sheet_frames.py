@@ -0,0 +1,146 @@
+import zlib
+from collections import namedtuple
+from PIL import Image
+from frame_analysis import (as_image, build_grid, compute_occupancy_grid, get_alpha_band,
+                            grid_cells, infer_grid, is_empty_frame, share_pixels, trim_box,
+                            trim_view_box)
+from sheet_stream import iter_row_bands
+
+# Frame recortado de una hoja:
+#   row, col: celda (o línea y posición con sprites detectados)
+#   index: número del frame entre los frames entregados (sin contar los vacíos)
+#   bbox: caja del frame en la hoja (left, upper, right, lower), ajustada con trim
+#   cell: caja de la celda completa en la hoja
+#   pixels: vista NumPy del frame dentro de la hoja (sin copiar), o su imagen de
+#           Pillow si NumPy no está instalado o el modo de la hoja no lo permite
+#   mode: modo de Pillow de la vista (None si pixels ya es una imagen)
+class Frame(namedtuple('Frame', 'row col index bbox cell pixels mode')):
+    __slots__ = ()
+
+    @property
+    def image(self):
+        """Imagen de Pillow del frame; con una vista se copia al pedirla (cada vez)"""
+        return as_image(self.pixels)
+
+class SplitError(ValueError):
+    """Error al dividir una hoja: archivo ilegible o cuadrícula que no cabe o no se puede deducir"""
+
+def open_sheet(input_file):
+    """Abre una hoja; lanza SplitError si no existe o no es una imagen"""
+    try:
+        return Image.open(input_file)
+    except OSError as e:
+        raise SplitError(f"No se pudo abrir {input_file}: {e}")
+
+def resolve_grid(sheet, cols=None, rows=None, frame_width=None, frame_height=None,
+                 margin_x=0, margin_y=0, spacing_x=0, spacing_y=0, detect_grid=False,
+                 alpha_threshold=0, background_color=None):
+    """
+    Cuadrícula de una hoja: la indicada (ver build_grid) o, con detect_grid, la
+    deducida de las separaciones vacías entre frames (ver infer_grid)
+    Lanza SplitError si la cuadrícula no cabe en la hoja o no se puede deducir.
+    """
+    if detect_grid:
+        grid = infer_grid(sheet, alpha_threshold, background_color)
+        if grid is None:
+            raise SplitError("No se pudo deducir la cuadrícula; indica --cols y --rows")
+        return grid
+
+    try:
+        return build_grid(sheet.width, sheet.height, cols, rows, frame_width, frame_height,
+                          margin_x, margin_y, spacing_x, spacing_y)
+    except ValueError as e:
+        raise SplitError(str(e))
+
+def iter_grid_bands(input_file, width, height, grid):
+    """
+    Decodifica una hoja por bandas de una fila de la cuadrícula (ver
+    sheet_stream.iter_row_bands), para pasarlas a iter_frames sin cargar la hoja
+    entera. Lanza SplitError si el PNG está dañado.
+
+    Yields:
+        (top, banda): la fila 0 de la banda es la fila top de la hoja
+    """
+    cells = grid_cells(width, height, **grid)
+    spans = [cells[row * grid['cols']][2][1::2] for row in range(grid['rows'])]
+    try:
+        for band in iter_row_bands(input_file, spans):
+            yield band
+    except (ValueError, zlib.error) as e:
+        raise SplitError(f"No se pudo decodificar {input_file} por bandas: {e}")
+
+def iter_frames(image, grid, remove_empty=True, empty_policy='transparent', alpha_threshold=0,
+                background_color=None, trim=False, bands=None):
+    """
+    Recorre los frames de una hoja sin escribir nada ni mostrar mensajes
+
+    Los frames se recortan a medida que se piden. Con NumPy la hoja (o cada
+    banda) se expone una sola vez como array y el recorte (y el ajuste con trim)
+    se hace sobre vistas: cada frame se entrega como vista (pixels) y solo se
+    copia si se pide su imagen (frame.image), por ejemplo para codificarlo.
+
+    Args:
+        image: Hoja ya abierta (con bands basta abrirla: solo se usa su tamaño)
+        grid: Cuadrícula (diccionario de resolve_grid/build_grid/infer_grid) o lista
+              de celdas (fila, columna, caja), por ejemplo de detect_sprites
+        remove_empty: Omitir los frames vacíos según empty_policy
+        empty_policy: Criterio de frame vacío ('transparent', 'alpha', 'color')
+        alpha_threshold: Alfa máximo de un frame vacío con la política 'alpha'
+        background_color: Color de fondo con la política 'color'
+        trim: Ajustar cada frame a la caja de sus píxeles no transparentes
+        bands: Bandas (top, imagen) de iter_grid_bands, una por fila de la
+               cuadrícula, en lugar de la hoja entera (solo con grid diccionario)
+
+    Yields:
+        Frame(row, col, index, bbox, cell, pixels, mode) en orden de lectura
+    """
+    if isinstance(grid, dict):
+        cells = grid_cells(image.width, image.height, **grid)
+    else:
+        cells = grid
+
+    if bands is None:
+        parts = [(0, image, cells)]
+    else:
+        cols = grid['cols']
+        parts = ((top, band, cells[row * cols:(row + 1) * cols])
+                 for row, (top, band) in enumerate(bands))
+
+    index = 0
+    for top, band, band_cells in parts:
+        band, pixels = share_pixels(band)
+
+        occupancy = None
+        if isinstance(grid, dict) and remove_empty and band_cells:
+            # Calcular de una vez qué celdas de la banda están ocupadas para no recortar las vacías
+            first_row = band_cells[0][0]
+            band_grid = dict(grid, rows=len(band_cells) // grid['cols'],
+                             margin_y=band_cells[0][2][1] - top)
+            occupancy = compute_occupancy_grid(band, policy=empty_policy,
+                                               alpha_threshold=alpha_threshold,
+                                               background=background_color, **band_grid)
+
+        # Banda alfa de la hoja para recortar cada frame a su contenido
+        alpha = get_alpha_band(band) if trim and pixels is None else None
+
+        for row, col, cell in band_cells:
+            if occupancy is not None and not occupancy[row - first_row][col]:
+                continue
+
+            # Coordenadas de la celda dentro de la banda
+            box = (cell[0], cell[1] - top, cell[2], cell[3] - top)
+            if pixels is not None:
+                bbox = trim_view_box(pixels, box) if trim else box
+                frame, mode = pixels[bbox[1]:bbox[3], bbox[0]:bbox[2]], band.mode
+            else:
+                bbox = trim_box(alpha, box) if trim else box
+                frame, mode = band.crop(bbox), None
+
+            # Celdas sueltas (sin cuadrícula): se comprueba cada frame por separado
+            if occupancy is None and remove_empty and not isinstance(grid, dict):
+                if is_empty_frame(as_image(frame), empty_policy, alpha_threshold, background_color):
+                    continue
+
+            yield Frame(row, col, index, (bbox[0], bbox[1] + top, bbox[2], bbox[3] + top), cell,
+                        frame, mode)
+            index += 1
@@ -0,0 +1,155 @@
+import io
+import zlib
+import struct
+from PIL import Image
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Modos de PNG de 8 bits por muestra que se pueden decodificar por bandas
+# (los bytes de cada fila reconstruida coinciden con los del modo de Pillow)
+STREAMABLE_MODES = ('L', 'LA', 'RGB', 'RGBA', 'P')
+
+def is_streamable(image):
+    """Verifica si una imagen abierta es un PNG que se puede decodificar por bandas"""
+    if image.format != 'PNG' or image.mode not in STREAMABLE_MODES or image.info.get('interlace'):
+        return False
+    tiles = getattr(image, 'tile', None) or []
+    return len(tiles) == 1 and tiles[0][0] == 'zip' and tiles[0][3] == image.mode
+
+def iter_row_bands(input_file, spans):
+    """
+    Decodifica una hoja por bandas horizontales sin cargarla entera en memoria
+
+    En los PNG no entrelazados de 8 bits el flujo IDAT se descomprime de forma
+    incremental: las filas de cada banda (aún filtradas) se envuelven en un PNG
+    mínimo sin comprimir, precedidas por la última fila ya reconstruida, y Pillow
+    las decodifica. En memoria solo queda una banda a la vez. Otros formatos se
+    decodifican completos y se recortan las bandas.
+
+    Args:
+        input_file: Ruta de la hoja
+        spans: Lista ordenada de (upper, lower) sin solapes, una por banda
+
+    Yields:
+        (top, banda): la fila 0 de la banda es la fila top de la hoja (top <= upper)
+    """
+    with Image.open(input_file) as image:
+        streamable = is_streamable(image)
+        if not streamable:
+            width = image.width
+            for upper, lower in spans:
+                yield upper, image.crop((0, upper, width, lower))
+
+    if streamable:
+        for band in _iter_png_bands(input_file, spans):
+            yield band
+
+def _iter_png_bands(input_file, spans):
+    """Bandas de un PNG decodificadas a partir del flujo IDAT (ver iter_row_bands)"""
+    with open(input_file, 'rb') as f:
+        if f.read(8) != PNG_SIGNATURE:
+            raise ValueError(f"{input_file} no es un PNG válido")
+
+        chunks = _iter_chunks(f)
+        header_chunks = []
+        first_data = None
+        for chunk_type, data in chunks:
+            if chunk_type == b'IDAT':
+                first_data = data
+                break
+            if chunk_type != b'IHDR':
+                header_chunks.append((chunk_type, data))
+            else:
+                ihdr = data
+
+        width, height, bit_depth, color_type = struct.unpack('>IIBB', ihdr[:10])
+        channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}[color_type]
+        row_bytes = 1 + width * channels
+        rows = _RowReader(first_data, chunks, row_bytes)
+
+        previous = None
+        y = 0
+        for upper, lower in spans:
+            # Filas intermedias (márgenes y espaciado): se reconstruyen y se descartan
+            while y < upper:
+                count = min(upper - y, max(1, lower - upper))
+                _, previous = _decode_rows(ihdr, header_chunks, rows.read(count), previous,
+                                           width, count)
+                y += count
+
+            band, last_row = _decode_rows(ihdr, header_chunks, rows.read(lower - upper), previous,
+                                          width, lower - upper)
+            yield (upper if previous is None else upper - 1), band
+            previous = last_row
+            y = lower
+
+def _iter_chunks(f):
+    """Recorre los chunks de un PNG a partir de la posición actual: (tipo, datos)"""
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        length, chunk_type = struct.unpack('>I4s', header)
+        data = f.read(length)
+        f.read(4)  # CRC: lo verifica Pillow al decodificar cada banda
+        yield chunk_type, data
+        if chunk_type == b'IEND':
+            return
+
+class _RowReader:
+    """Descompresión incremental del flujo IDAT, entregando filas filtradas completas"""
+
+    def __init__(self, first_data, chunks, row_bytes):
+        self.decompressor = zlib.decompressobj()
+        self.pending = first_data or b''
+        self.chunks = chunks
+        self.row_bytes = row_bytes
+
+    def read(self, count):
+        """Bytes filtrados de las siguientes count filas (con su byte de filtro)"""
+        needed = count * self.row_bytes
+        parts = []
+        while needed > 0:
+            if not self.pending:
+                self.pending = self._next_idat()
+                if self.pending is None:
+                    raise ValueError("El flujo de datos del PNG está incompleto")
+            data = self.decompressor.decompress(self.pending, needed)
+            self.pending = self.decompressor.unconsumed_tail
+            needed -= len(data)
+            parts.append(data)
+        return b''.join(parts)
+
+    def _next_idat(self):
+        for chunk_type, data in self.chunks:
+            if chunk_type == b'IDAT':
+                return data
+            if chunk_type == b'IEND':
+                break
+        return None
+
+def _decode_rows(ihdr, header_chunks, raw_rows, previous, width, count):
+    """
+    Decodifica un bloque de filas filtradas con Pillow
+    Retorna (imagen, bytes de la última fila reconstruida)
+    """
+    if previous is not None:
+        # La fila anterior reconstruida, sin filtro, sirve de referencia a la primera
+        raw_rows = b'\x00' + previous + raw_rows
+        count += 1
+
+    header = ihdr[:4] + struct.pack('>I', count) + ihdr[8:]
+    png = [PNG_SIGNATURE, _chunk(b'IHDR', header)]
+    png.extend(_chunk(chunk_type, data) for chunk_type, data in header_chunks)
+    png.append(_chunk(b'IDAT', zlib.compress(raw_rows, 0)))
+    png.append(_chunk(b'IEND', b''))
+
+    band = Image.open(io.BytesIO(b''.join(png)))
+    band.load()
+    last_row = band.crop((0, count - 1, width, count)).tobytes()
+    return band, last_row
+
+def _chunk(chunk_type, data):
+    """Serializa un chunk PNG (longitud, tipo, datos y CRC)"""
+    return (struct.pack('>I', len(data)) + chunk_type + data
+            + struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff))
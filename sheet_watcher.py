@@ -0,0 +1,157 @@
+import os
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+from image_discovery import clear_scan_cache
+
+# Segundos sin cambios antes de avisar: los editores guardan una hoja con varias
+# escrituras (o archivo temporal y renombrado) y solo interesa el resultado final
+DEFAULT_DEBOUNCE = 0.3
+
+# Intervalo entre revisiones de las carpetas cuando no hay inotify
+POLL_INTERVAL = 0.5
+
+# Eventos de inotify (linux/inotify.h): escrituras, archivos cerrados tras
+# escribir, renombrados hacia la carpeta y archivos nuevos
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+# Cabecera de cada evento: descriptor, máscara, cookie y longitud del nombre
+EVENT = struct.Struct('iIII')
+
+class InotifyWatcher:
+    """Cambios en carpetas avisados por el kernel (Linux), sin recorrerlas"""
+
+    def __init__(self, directories):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "No se pudo iniciar inotify")
+
+        self.directories = {}
+        for directory in directories:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(error, f"No se pudo vigilar {directory}")
+            self.directories[wd] = directory
+
+    def read(self, timeout=None):
+        """Archivos cambiados en las carpetas; espera hasta timeout segundos (None: sin límite)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + EVENT.size <= len(data):
+            wd, _, _, length = EVENT.unpack_from(data, offset)
+            name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b'\0')
+            offset += EVENT.size + length
+            if name and wd in self.directories:
+                changed.add(os.path.join(self.directories[wd], os.fsdecode(name)))
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Cambios en carpetas comparando fecha y tamaño de sus archivos cada interval segundos"""
+
+    def __init__(self, directories, interval=POLL_INTERVAL):
+        self.directories = list(directories)
+        self.interval = interval
+        self.state = self._scan()
+
+    def _scan(self):
+        state = {}
+        for directory in self.directories:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            state[os.path.join(directory, entry.name)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                pass
+        return state
+
+    def read(self, timeout=None):
+        """Archivos nuevos o cambiados desde la última revisión"""
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        state = self._scan()
+        changed = {path for path, signature in state.items() if self.state.get(path) != signature}
+        self.state = state
+        return changed
+
+    def close(self):
+        pass
+
+def open_watcher(directories, polling=False):
+    """inotify en Linux; revisión periódica en el resto de sistemas, si falla o con polling=True"""
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError):
+            # Sin libc con inotify o límite de vigilancias agotado
+            pass
+    return PollingWatcher(directories)
+
+def watch(paths, on_change, debounce=DEFAULT_DEBOUNCE, polling=False):
+    """
+    Vigila archivos y carpetas y llama a on_change(archivos) con los que cambiaron
+
+    Las ráfagas de escrituras se agrupan: on_change se llama cuando pasan debounce
+    segundos sin cambios nuevos, una vez por tanda y con cada archivo una sola vez.
+    Las carpetas se vigilan sin sus subcarpetas. Termina con Ctrl+C.
+
+    Args:
+        paths: Archivos o carpetas a vigilar
+        on_change: Función que recibe la lista ordenada de archivos cambiados
+        debounce: Segundos sin cambios antes de llamar a on_change
+        polling: Revisar las carpetas periódicamente aunque haya inotify
+    """
+    files = set()
+    folders = set()
+    for path in paths:
+        path = os.path.normpath(path)
+        if os.path.isdir(path):
+            folders.add(path)
+        else:
+            files.add(path)
+
+    def wanted(path):
+        return path in files or (os.path.dirname(path) or '.') in folders
+
+    # Los archivos se vigilan a través de su carpeta para ver también los
+    # guardados con archivo temporal y renombrado
+    directories = folders | {os.path.dirname(path) or '.' for path in files}
+    watcher = open_watcher(sorted(directories), polling)
+    try:
+        pending = set()
+        while True:
+            changed = {path for path in map(os.path.normpath, watcher.read(debounce if pending else None))
+                       if wanted(path)}
+            if changed:
+                pending |= changed
+            elif pending:
+                # Las carpetas cambiadas se vuelven a leer aunque su fecha no cambie
+                # (resolución de la fecha del sistema de archivos)
+                clear_scan_cache({os.path.dirname(path) or '.' for path in pending})
+                on_change(sorted(pending))
+                pending = set()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
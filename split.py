@@ -1,19 +1,29 @@
 import os
 from PIL import Image
 import argparse
-import glob
 import re
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from frame_encoding import (OUTPUT_FORMATS, PNG_PROFILES, check_output_format, encode_frame,
+                            output_extension, png_encoding)
+from frame_analysis import (EMPTY_POLICIES, detect_sprites, infer_grid, parse_color, parse_size,
+                            share_pixels)
+from frame_metadata import index_entry, index_metadata_name, trim_entry, trim_metadata_name
+from output_sinks import DEFAULT_OUTPUT_DIR, DirectorySink, PackSink, open_sink
+from sheet_frames import SplitError, iter_frames, iter_grid_bands, open_sheet, resolve_grid
+from pixel_cache import DEFAULT_CACHE_DIR, open_cached_sheet
+from sheet_watcher import DEFAULT_DEBOUNCE, watch
+from image_discovery import find_image_directories, find_images
+from manifest import (build_entry, frame_digest, is_up_to_date, load_manifest, manifest_key,
+                      remove_stale_outputs, reusable_entry, save_manifest)
+
+# Extensiones de las hojas que se listan y se dividen al vigilar una carpeta (--watch)
+SHEET_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tga')
 
 def get_image_files_in_current_dir():
     """Obtiene todos los archivos de imagen en el directorio actual"""
-    image_extensions = ['*.png', '*.jpg', '*.jpeg', '*.bmp', '*.gif', '*.tga']
-    image_files = []
-    
-    for extension in image_extensions:
-        image_files.extend(glob.glob(extension))
-        image_files.extend(glob.glob(extension.upper()))
-    
-    return sorted(image_files)
+    return find_images('.', SHEET_EXTENSIONS)
 
 def find_image_subdirectories(base_dir):
     """
@@ -23,32 +33,15 @@ def find_image_subdirectories(base_dir):
     image_subdirs = []
     
     try:
-        # Obtener todos los elementos en el directorio base
-        for item in os.listdir(base_dir):
-            item_path = os.path.join(base_dir, item)
-            
-            # Verificar si es un directorio
-            if os.path.isdir(item_path):
-                # Buscar archivos de imagen en este subdirectorio
-                image_extensions = ['*.png', '*.jpg', '*.jpeg', '*.bmp', '*.gif', '*.tga']
-                has_images = False
-                
-                for extension in image_extensions:
-                    # Buscar con extensión normal y en mayúsculas
-                    if (glob.glob(os.path.join(item_path, extension)) or 
-                        glob.glob(os.path.join(item_path, extension.upper()))):
-                        has_images = True
-                        break
-                
-                if has_images:
-                    image_subdirs.append(item_path)
+        # Una lectura por carpeta (ver image_discovery), sin un glob por extensión
+        image_subdirs = find_image_directories(base_dir, SHEET_EXTENSIONS)
     
     except PermissionError:
         print(f"❌ No se pudo acceder a un directorio por falta de permisos")
     except Exception as e:
         print(f"❌ Error al escanear subdirectorios: {e}")
     
-    return sorted(image_subdirs)
+    return image_subdirs
 
 def clean_filename(name):
     """
@@ -288,16 +281,31 @@ def get_user_input():
     
     print(f"✅ Archivo seleccionado: {input_path}")
     
-    # Columnas y filas
-    while True:
-        try:
-            cols = int(input("\n🔢 Número de columnas en el spritesheet: "))
-            rows = int(input("🔢 Número de filas en el spritesheet: "))
-            if cols > 0 and rows > 0:
-                break
-            print("❌ Las columnas y filas deben ser números positivos.")
-        except ValueError:
-            print("❌ Por favor ingresa números válidos.")
+    # Columnas y filas: primero intentar deducirlas de las separaciones vacías
+    detect_grid = False
+    try:
+        with Image.open(input_path) as sheet:
+            grid = infer_grid(sheet)
+    except Exception:
+        grid = None
+    
+    if grid:
+        print(f"\n📐 Cuadrícula detectada: {describe_grid(grid)}")
+        use_grid = input("❓ ¿Usar esta cuadrícula? (S/n): ").strip().lower()
+        detect_grid = use_grid not in ['n', 'no']
+    
+    if detect_grid:
+        cols, rows = grid['cols'], grid['rows']
+    else:
+        while True:
+            try:
+                cols = int(input("\n🔢 Número de columnas en el spritesheet: "))
+                rows = int(input("🔢 Número de filas en el spritesheet: "))
+                if cols > 0 and rows > 0:
+                    break
+                print("❌ Las columnas y filas deben ser números positivos.")
+            except ValueError:
+                print("❌ Por favor ingresa números válidos.")
     
     # Prefijo
     prefix = input("\n🏷️  Prefijo para los nombres de archivo (ej: walk, idle, attack): ").strip()
@@ -359,8 +367,8 @@ def get_user_input():
             print("❌ Por favor ingresa un número válido.")
     
     # Formato
-    format_choice = input("\n🖼️  Formato de salida (PNG/JPEG) [PNG]: ").strip().upper()
-    if format_choice not in ['PNG', 'JPEG']:
+    format_choice = input(f"\n🖼️  Formato de salida ({'/'.join(OUTPUT_FORMATS)}) [PNG]: ").strip().upper()
+    if format_choice not in OUTPUT_FORMATS:
         format_choice = 'PNG'
     
     # Frames vacíos
@@ -377,110 +385,418 @@ def get_user_input():
         'format': format_choice,
         'remove_empty': remove_empty,
         'row_names': row_names,
-        'col_names': col_names
+        'col_names': col_names,
+        'detect_grid': detect_grid
+    }
+
+def describe_grid(grid):
+    """Texto legible de una cuadrícula deducida con infer_grid"""
+    return (f"{grid['cols']}x{grid['rows']} frames de {grid['frame_width']}x{grid['frame_height']} "
+            f"(margen {grid['margin_x']}x{grid['margin_y']}, "
+            f"espaciado {grid['spacing_x']}x{grid['spacing_y']})")
+
+def sheet_params(prefix, cols, rows, start_number=0, format="PNG", remove_empty=True,
+                 organize_by=None, row_names=None, col_names=None, empty_policy='transparent',
+                 alpha_threshold=0, background_color=None, auto_detect=False, merge_distance=0,
+                 min_area=0, detect_grid=False, frame_width=None, frame_height=None, margin_x=0,
+                 margin_y=0, spacing_x=0, spacing_y=0, trim=False, dedup=False, png_encoding=None,
+                 label_names=True, pack=False):
+    """Parámetros que determinan la salida de una hoja (se guardan en el manifiesto)"""
+    return {
+        'prefix': prefix,
+        'cols': cols,
+        'rows': rows,
+        'start_number': start_number,
+        'format': format.upper(),
+        'remove_empty': remove_empty,
+        'organize_by': organize_by,
+        'row_names': row_names,
+        'col_names': col_names,
+        'label_names': label_names,
+        'empty_policy': empty_policy,
+        'alpha_threshold': alpha_threshold,
+        # Normalizado a lista para que coincida con el valor leído del JSON
+        'background_color': list(parse_color(background_color)) if background_color else None,
+        'auto_detect': auto_detect,
+        'merge_distance': merge_distance,
+        'min_area': min_area,
+        'detect_grid': detect_grid,
+        'frame_width': frame_width,
+        'frame_height': frame_height,
+        'margin_x': margin_x,
+        'margin_y': margin_y,
+        'spacing_x': spacing_x,
+        'spacing_y': spacing_y,
+        'trim': trim,
+        'dedup': dedup,
+        'png_encoding': png_encoding,
+        'pack': pack
     }
 
 def split_spritesheet(input_file, prefix, cols, rows, 
                      start_number=0, format="PNG", remove_empty=True,
-                     organize_by=None, row_names=None, col_names=None):
+                     organize_by=None, row_names=None, col_names=None,
+                     empty_policy='transparent', alpha_threshold=0, background_color=None,
+                     jobs=1, executor='thread', force=False,
+                     auto_detect=False, merge_distance=0, min_area=0, detect_grid=False,
+                     frame_width=None, frame_height=None, margin_x=0, margin_y=0,
+                     spacing_x=0, spacing_y=0, trim=False, dedup=False, pixel_cache=None,
+                     png_profile=None, png_compress_level=None, png_optimize=None,
+                     png_palette=None, output=DEFAULT_OUTPUT_DIR, encode_pool=None,
+                     stream=False, label_names=True, update_manifest=True, previous_entry=None,
+                     manifest_checked=False):
     """
     Divide un spritesheet en frames individuales en la carpeta 'sprites'
+    
+    Con auto_detect=True se ignoran cols y rows: cada sprite se localiza como una
+    región conectada de píxeles no transparentes (ver detect_sprites). Las partes
+    sueltas a merge_distance píxeles o menos se unen al mismo sprite y las
+    regiones con área menor que min_area se descartan. Las filas y columnas
+    pasan a ser la línea de sprites y la posición dentro de la línea.
+    
+    Con detect_grid=True las columnas, filas, margen y espaciado de una hoja
+    regular se deducen de las separaciones vacías entre frames (ver infer_grid).
+    
+    Para hojas con márgenes o separación entre frames se indican margin_x/y
+    (borde de la hoja) y spacing_x/y (entre frames). Con frame_width/height
+    cols y rows son opcionales: se usan todas las celdas que caben. La tabla de
+    rectángulos se calcula una vez y cada frame se recorta directamente en su
+    posición final.
+    
+    Con stream=True la hoja (un PNG de 8 bits no entrelazado) se decodifica por
+    bandas de una fila de frames (ver sheet_frames.iter_grid_bands) en lugar de
+    entera, para hojas que no caben en memoria; necesita la cuadrícula indicada.
+    
+    Con organize_by, label_names=False deja el nombre de la fila o columna solo en
+    la subcarpeta ('col_0/walk_3.png' en lugar de 'col_0/walk_col_0_3.png').
+    
+    Con trim=True cada frame se ajusta a la caja de sus píxeles no transparentes
+    (getbbox sobre la banda alfa de la celda) y el tamaño de la celda y la
+    posición del recorte se guardan en '<prefijo>_trim.json'.
+    
+    Con dedup=True los frames con el mismo contenido se escriben una sola vez
+    (con el nombre del primero) y '<prefijo>_index.json' indica qué archivo
+    corresponde a cada número de frame y celda.
+    
+    Con pixel_cache (una carpeta) los píxeles decodificados de la hoja se guardan
+    en un archivo crudo identificado por el hash del contenido; las siguientes
+    divisiones de la misma hoja (por ejemplo, probando otra cuadrícula) lo mapean
+    en memoria en lugar de volver a descomprimir el PNG.
+    
+    La codificación PNG se ajusta con png_profile ('fast', 'balanced' o
+    'smallest', ver PNG_PROFILES) y, por encima del perfil, con
+    png_compress_level (nivel de zlib 0-9), png_optimize y png_palette (guardar
+    con paleta, sin pérdida, los frames de 256 colores o menos). Sin ninguno se
+    usan las opciones por defecto de Pillow.
+    
+    output es el destino de los frames: una carpeta (por defecto 'sprites', con
+    la estructura de subcarpetas de organize_by), un paquete .fpack, un archivo
+    .zip, .tar o .tar.gz, o un sink propio (ver output_sinks, por ejemplo
+    MemorySink para recibir los frames en memoria). Los destinos indicados por
+    ruta se cierran al terminar; los sinks propios los cierra quien los creó.
+    
+    Con jobs > 1 la codificación de los frames se reparte en un pool de hilos
+    (Pillow libera el GIL al comprimir) o de procesos (executor='process').
+    jobs=0 usa todos los núcleos disponibles. Con encode_pool se usa ese pool
+    (de create_encode_pool) en lugar de crear uno; no se cierra al terminar.
+    
+    Si la hoja y los parámetros no cambiaron desde la última ejecución (según el
+    manifiesto de la carpeta de salida) no se vuelve a dividir, salvo con force=True. Los
+    frames cuyo contenido no cambió tampoco se vuelven a codificar ni escribir (con
+    force=True se reescriben todos). Los lotes consultan el manifiesto una sola
+    vez: pasan manifest_checked=True con la entrada anterior de la hoja en
+    previous_entry (None = nada que reutilizar) y, con update_manifest=False,
+    guardan ellos la entrada de result['manifest_entry'].
+    
+    Los frames se obtienen con sheet_frames.iter_frames como vistas de la hoja;
+    esta función solo les da nombre, los hashea sin copiarlos, codifica los que
+    hay que escribir, los entrega al destino y muestra el progreso. Los
+    errores de la hoja (SplitError, archivos ilegibles) se muestran y se
+    registran en el resultado; cualquier otra excepción se propaga.
+    
+    Returns:
+        Diccionario con 'input_file', 'saved', 'written', 'identical', 'duplicates',
+        'empty', 'unchanged', 'error' (None si todo fue bien) y 'manifest_entry'
+        (None si el destino no es incremental)
     """
+    result = {'input_file': input_file, 'saved': 0, 'written': 0, 'identical': 0, 'duplicates': 0,
+              'empty': 0, 'unchanged': False, 'error': None, 'manifest_entry': None}
+    
+    # Formato de salida, opciones de codificación PNG (perfil con los valores indicados
+    # encima) y color de fondo
+    try:
+        check_output_format(format)
+        extension = output_extension(format)
+        encoding = png_encoding(png_profile, png_compress_level, png_optimize, png_palette)
+        parse_color(background_color)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        result['error'] = str(e)
+        return result
+    
+    # Destino de los frames: una carpeta (por defecto 'sprites/'), un archivo o un sink propio
+    owns_sink = isinstance(output, str)
+    sink = open_sink(output) if owns_sink else output
+    if sink.incremental and not os.path.exists(sink.root):
+        os.makedirs(sink.root)
+        print(f"\n✅ Carpeta base creada: {sink.root}/")
     
-    # Crear directorio base 'sprites' en la raíz de ejecución
-    base_output_dir = "sprites"
-    if not os.path.exists(base_output_dir):
-        os.makedirs(base_output_dir)
-        print(f"\n✅ Carpeta base creada: {base_output_dir}/")
+    # Parámetros que determinan la salida, guardados en el manifiesto
+    params = sheet_params(prefix, cols, rows, start_number, format, remove_empty, organize_by,
+                          row_names, col_names, empty_policy, alpha_threshold, background_color,
+                          auto_detect, merge_distance, min_area, detect_grid, frame_width,
+                          frame_height, margin_x, margin_y, spacing_x, spacing_y, trim, dedup,
+                          encoding, label_names, isinstance(sink, PackSink))
+    
+    # Omitir hojas sin cambios desde la última ejecución (solo en carpetas y paquetes:
+    # los archivos y la memoria se escriben completos). Con force tampoco se reutilizan
+    # sus frames; con manifest_checked el llamador ya consultó el manifiesto
+    if force:
+        previous_entry = None
+    elif sink.incremental and not manifest_checked:
+        manifest = load_manifest(sink.root)
+        entry = manifest.get(manifest_key(input_file, prefix))
+        if previous_entry is None:
+            previous_entry = entry
+        previous_mtime = entry.get('mtime') if entry else None
+        if is_up_to_date(manifest, input_file, params):
+            # El hash confirmó la hoja con otra fecha: guardarla para no volver a hashearla
+            if update_manifest and entry['mtime'] != previous_mtime:
+                save_manifest(manifest, sink.root)
+            print(f"\n⏩ Sin cambios desde la última ejecución: {input_file}")
+            print("   Usa --force para dividirla de nuevo")
+            result['unchanged'] = True
+            return result
+    
+    # Los frames escritos con otro formato u otras opciones de PNG se vuelven a codificar
+    previous_entry = reusable_entry(previous_entry, params)
     
     # Abrir la imagen
+    sheet = None
+    sink_closed = False
     try:
-        sheet = Image.open(input_file)
-        sheet_width, sheet_height = sheet.size
+        if stream and (auto_detect or detect_grid or pixel_cache):
+            raise SplitError("La detección de sprites o de la cuadrícula y la caché de píxeles "
+                             "necesitan la hoja completa; indica la cuadrícula para decodificar por bandas")
         
-        # Calcular dimensiones de cada frame
-        frame_width = sheet_width // cols
-        frame_height = sheet_height // rows
+        sheet_digest = None
+        if pixel_cache:
+            # Píxeles ya decodificados en una ejecución anterior: se mapean sin inflar el PNG
+            sheet, sheet_digest, cached = open_cached_sheet(input_file, pixel_cache)
+            print("⚡ Píxeles leídos de la caché" if cached else f"💽 Píxeles decodificados ({pixel_cache}/)")
+        else:
+            sheet = open_sheet(input_file)
+        if not stream:
+            # Con NumPy, la hoja pasa a compartir el buffer del array de sus frames
+            # (sin quedarse también con la copia decodificada)
+            sheet, _ = share_pixels(sheet)
+        sheet_width, sheet_height = sheet.size
         
         print(f"\n📊 Spritesheet: {sheet_width}x{sheet_height}")
-        print(f"🎬 Frames: {cols}x{rows} -> {frame_width}x{frame_height} cada uno")
         
-        frame_count = 0
+        if auto_detect:
+            # Hoja irregular: un frame por cada región conectada de píxeles
+            grid = detect_sprites(sheet, alpha_threshold, merge_distance, min_area)
+            cell_count = len(grid)
+            rows = grid[-1][0] + 1 if grid else 0
+            cols = max((col for _, col, _ in grid), default=-1) + 1
+            row_names = col_names = None
+            print(f"🔍 Sprites detectados: {cell_count} en {rows} líneas")
+        else:
+            # Cuadrícula indicada o deducida de las separaciones vacías entre frames
+            grid = resolve_grid(sheet, cols, rows, frame_width, frame_height, margin_x, margin_y,
+                                spacing_x, spacing_y, detect_grid, alpha_threshold,
+                                background_color if empty_policy == 'color' else None)
+            if detect_grid:
+                print(f"📐 Cuadrícula detectada: {describe_grid(grid)}")
+            cols, rows = grid['cols'], grid['rows']
+            cell_count = cols * rows
+            print(f"🎬 Frames: {cols}x{rows} -> {grid['frame_width']}x{grid['frame_height']} cada uno")
+        
         saved_count = 0
+        written_count = 0
+        frames = {}
+        trimmed = {}
         
-        for row in range(rows):
-            for col in range(cols):
-                # Calcular coordenadas del frame
-                left = col * frame_width
-                upper = row * frame_height
-                right = left + frame_width
-                lower = upper + frame_height
+        # Frames únicos por contenido (hash del buffer de píxeles) e índice de la hoja
+        unique_frames = {}
+        index = []
+        duplicate_count = 0
+        
+        # Pool de codificación: los números de frame se asignan en orden antes de enviar
+        # y los frames se entregan al sink en ese mismo orden, a medida que terminan;
+        # como mucho window frames esperan en cola (con stream, la memoria sigue
+        # acotada a unas pocas filas de frames)
+        pool = encode_pool or create_encode_pool(jobs, executor)
+        pending = deque()
+        window = 2 * (jobs if jobs and jobs > 0 else os.cpu_count())
+        sink.begin({'source': input_file, 'prefix': prefix, 'format': format.upper(),
+                    'png_encoding': encoding})
+        
+        # Con stream, la hoja se decodifica por bandas de una fila de frames
+        bands = None
+        if stream:
+            bands = iter_grid_bands(input_file, sheet_width, sheet_height, grid)
+            print(f"🌊 Decodificando por bandas: {rows} bandas de {grid['frame_height']} filas")
+        
+        # Los sprites detectados nunca están vacíos: solo se comprueban las celdas
+        for frame in iter_frames(sheet, grid, remove_empty and not auto_detect, empty_policy,
+                                 alpha_threshold, background_color, trim, bands):
+            if pool:
+                drain(sink, pending, window)
+            row, col, crop_box, box = frame.row, frame.col, frame.bbox, frame.cell
+            
+            # Determinar la subcarpeta según la organización
+            folder = ''
+            
+            if organize_by == 'column':
+                # Organizar por columnas
+                col_name = col_names[col] if col_names else f"col_{col}"
+                folder = f"{col_name}/"
                 
-                # Recortar el frame
-                frame = sheet.crop((left, upper, right, lower))
+            elif organize_by == 'row':
+                # Organizar por filas
+                row_name = row_names[row] if row_names else f"row_{row}"
+                folder = f"{row_name}/"
                 
-                # Verificar si el frame está vacío (opcional)
-                if remove_empty and is_empty_frame(frame):
-                    frame_count += 1
+            elif organize_by == 'both':
+                # Organizar bidimensionalmente: filas/columnas
+                row_name = row_names[row] if row_names else f"row_{row}"
+                col_name = col_names[col] if col_names else f"col_{col}"
+                folder = f"{row_name}/{col_name}/"
+            
+            # Determinar el nombre del frame (relativo al destino, con '/' como separador)
+            if organize_by and not label_names:
+                # Solo la subcarpeta lleva el nombre de la fila o columna
+                frame_number = start_number + saved_count
+                name = f"{folder}{prefix}_{frame_number}.{extension}"
+            elif organize_by == 'both':
+                # Para organización bidimensional, incluir ambos nombres
+                frame_number = start_number + saved_count
+                name = f"{folder}{prefix}_{row_names[row] if row_names else f'row_{row}'}_{col_names[col] if col_names else f'col_{col}'}_{frame_number}.{extension}"
+            elif organize_by == 'row':
+                # Para organización por filas, incluir nombre de fila
+                frame_number = start_number + saved_count
+                name = f"{folder}{prefix}_{row_names[row] if row_names else f'row_{row}'}_{frame_number}.{extension}"
+            elif organize_by == 'column':
+                # Para organización por columnas, incluir nombre de columna
+                frame_number = start_number + saved_count
+                name = f"{folder}{prefix}_{col_names[col] if col_names else f'col_{col}'}_{frame_number}.{extension}"
+            else:
+                # Sin organización especial
+                frame_number = start_number + saved_count
+                name = f"{prefix}_{frame_number}.{extension}"
+            
+            # Tamaño, recorte y celda del frame para los sinks que los guardan (paquetes)
+            digest = frame_digest(frame.pixels, frame.mode)
+            info = {'size': (crop_box[2] - crop_box[0], crop_box[3] - crop_box[1]),
+                    'trim_offset': (crop_box[0] - box[0], crop_box[1] - box[1]),
+                    'source_size': (box[2] - box[0], box[3] - box[1]),
+                    'frame': frame_number, 'row': row, 'col': col, 'digest': digest}
+            
+            # Con dedup, los frames repetidos apuntan al primer archivo con el mismo contenido
+            if dedup:
+                content_key = digest
+                if trim:
+                    content_key = (digest,) + info['trim_offset'] + info['source_size']
+                canonical = unique_frames.setdefault(content_key, name)
+                index.append(index_entry(frame_number, row, col, canonical))
+                if canonical != name:
+                    print(f"🔁 Frame {frame_number} repetido: {sink.location(canonical)}")
+                    deliver(sink, pending if pool else None, name, None, info, canonical)
+                    duplicate_count += 1
+                    saved_count += 1
                     continue
-                
-                # Determinar el directorio de salida según la organización
-                output_dir = base_output_dir
-                
-                if organize_by == 'column':
-                    # Organizar por columnas
-                    col_name = col_names[col] if col_names else f"col_{col}"
-                    output_dir = os.path.join(base_output_dir, col_name)
-                    
-                elif organize_by == 'row':
-                    # Organizar por filas
-                    row_name = row_names[row] if row_names else f"row_{row}"
-                    output_dir = os.path.join(base_output_dir, row_name)
-                    
-                elif organize_by == 'both':
-                    # Organizar bidimensionalmente: filas/columnas
-                    row_name = row_names[row] if row_names else f"row_{row}"
-                    col_name = col_names[col] if col_names else f"col_{col}"
-                    output_dir = os.path.join(base_output_dir, row_name, col_name)
-                
-                # Crear subdirectorio si es necesario
-                if organize_by and not os.path.exists(output_dir):
-                    os.makedirs(output_dir)
-                
-                # Determinar el nombre del archivo
-                if organize_by == 'both':
-                    # Para organización bidimensional, incluir ambos nombres
-                    frame_number = start_number + saved_count
-                    output_file = os.path.join(output_dir, f"{prefix}_{row_names[row] if row_names else f'row_{row}'}_{col_names[col] if col_names else f'col_{col}'}_{frame_number}.{format.lower()}")
-                elif organize_by == 'row':
-                    # Para organización por filas, incluir nombre de fila
-                    frame_number = start_number + saved_count
-                    output_file = os.path.join(output_dir, f"{prefix}_{row_names[row] if row_names else f'row_{row}'}_{frame_number}.{format.lower()}")
-                elif organize_by == 'column':
-                    # Para organización por columnas, incluir nombre de columna
-                    frame_number = start_number + saved_count
-                    output_file = os.path.join(output_dir, f"{prefix}_{col_names[col] if col_names else f'col_{col}'}_{frame_number}.{format.lower()}")
-                else:
-                    # Sin organización especial
-                    frame_number = start_number + saved_count
-                    output_file = os.path.join(output_dir, f"{prefix}_{frame_number}.{format.lower()}")
-                
-                # Guardar el frame
-                frame.save(output_file, format.upper())
+            
+            if trim:
+                trimmed[name] = trim_entry(box, crop_box)
+            
+            # Omitir la escritura si el frame es idéntico al de la última ejecución, o
+            # reutilizar sus bytes ya codificados si el destino los conserva (paquetes)
+            if sink.incremental:
+                frames[name] = digest
+                if sink.is_unchanged(name, digest, previous_entry):
+                    print(f"✔️  {sink.location(name)} (sin cambios)")
+                    saved_count += 1
+                    continue
+                data = sink.previous_frame(digest) if previous_entry else None
+                if data is not None:
+                    deliver(sink, pending if pool else None, name, data, info)
+                    print(f"✔️  {sink.location(name)} (sin cambios)")
+                    saved_count += 1
+                    continue
+            
+            # Codificar el frame (en el pool si hay varios workers) y entregarlo al sink
+            if pool:
+                deliver(sink, pending, name, pool.submit(encode_frame, frame.pixels, format, encoding), info)
+            else:
+                deliver(sink, None, name, encode_frame(frame.pixels, format, encoding), info)
                 
                 # Mostrar mensaje con la ubicación
-                relative_path = os.path.relpath(output_file)
-                print(f"💾 {relative_path}")
-                
-                frame_count += 1
-                saved_count += 1
+                print(f"💾 {sink.location(name)}")
+            written_count += 1
+            saved_count += 1
+        
+        # Esperar a los workers y entregar los frames que quedan en cola
+        if pool:
+            try:
+                drain(sink, pending)
+            finally:
+                if encode_pool is None:
+                    pool.shutdown()
+        
+        # Guardar la posición de los frames recortados dentro de sus celdas
+        if trim:
+            metadata_name = trim_metadata_name(prefix)
+            metadata_file = sink.location(metadata_name)
+            metadata = {'source': input_file, 'prefix': prefix, 'frames': trimmed}
+            digest = sink.write_metadata(metadata_name, metadata, previous_entry)
+            if sink.incremental:
+                frames[metadata_name] = digest
+            source_area = sum(e['sourceSize']['w'] * e['sourceSize']['h'] for e in trimmed.values())
+            trimmed_area = sum(e['spriteSourceSize']['w'] * e['spriteSourceSize']['h'] for e in trimmed.values())
+            if source_area:
+                print(f"✂️  Recorte: área reducida un {100 - 100 * trimmed_area / source_area:.0f}% "
+                      f"(offsets en {metadata_file})")
+        
+        # Guardar el índice frame -> archivo de la hoja deduplicada
+        if dedup:
+            index_name = index_metadata_name(prefix)
+            index_file = sink.location(index_name)
+            metadata = {'source': input_file, 'prefix': prefix, 'unique': len(unique_frames),
+                        'frames': index}
+            digest = sink.write_metadata(index_name, metadata, previous_entry)
+            if sink.incremental:
+                frames[index_name] = digest
+            print(f"🔁 Deduplicación: {len(unique_frames)} frames únicos de {len(index)} "
+                  f"(índice en {index_file})")
+        
+        # Terminar la salida (los archivos se reemplazan al cerrarlos)
+        if owns_sink:
+            sink.close()
+            sink_closed = True
+        
+        # Registrar la hoja en el manifiesto y borrar frames que ya no se generan (los
+        # lotes reciben la entrada en el resultado y guardan el manifiesto al final)
+        if sink.incremental:
+            result['manifest_entry'] = build_entry(input_file, params, sink.outputs(frames), sheet_digest)
+            if update_manifest:
+                manifest = load_manifest(sink.root)
+                key = manifest_key(input_file, prefix)
+                remove_stale_outputs(manifest.get(key), result['manifest_entry'])
+                manifest[key] = result['manifest_entry']
+                save_manifest(manifest, sink.root)
+        if not isinstance(sink, DirectorySink):
+            print(f"\n📦 Frames guardados en {sink.describe()}")
         
         # Mostrar resumen de la organización
         print(f"\n📁 Organización: {organize_by if organize_by else 'sin subcarpetas'}")
-        print(f"🎉 Proceso completado: {saved_count} frames guardados")
+        print(f"🎉 Proceso completado: {saved_count} frames guardados "
+              f"({written_count} escritos, {saved_count - written_count - duplicate_count} sin cambios"
+              f"{f', {duplicate_count} repetidos' if duplicate_count else ''})")
         
-        if organize_by:
-            print(f"📂 Carpeta base: {base_output_dir}/")
+        if organize_by and isinstance(sink, DirectorySink):
+            print(f"📂 Carpeta base: {sink.describe()}")
             
             if organize_by == 'column':
                 if col_names:
@@ -509,19 +825,122 @@ def split_spritesheet(input_file, prefix, cols, rows,
                 else:
                     print(f"   Columnas: {cols} (col_0 a col_{cols-1})")
         
-    except Exception as e:
+        result['saved'] = saved_count
+        result['written'] = written_count
+        result['identical'] = saved_count - written_count - duplicate_count
+        result['duplicates'] = duplicate_count
+        result['empty'] = cell_count - saved_count
+        
+    except (SplitError, OSError) as e:
         print(f"❌ Error al procesar el archivo: {e}")
+        result['error'] = str(e)
+    
+    finally:
+        # Descartar la salida a medio escribir si la hoja no terminó
+        if owns_sink and not sink_closed:
+            sink.abort()
+        if sheet is not None:
+            sheet.close()
+    
+    return result
 
-def is_empty_frame(image):
-    """Verifica si un frame está completamente vacío/transparente"""
-    if image.mode != 'RGBA':
-        image = image.convert('RGBA')
-    
-    pixels = list(image.getdata())
-    for pixel in pixels:
-        if pixel[3] != 0:
-            return False
-    return True
+def deliver(sink, pending, name, data, info, original=None):
+    """
+    Entrega un frame codificado (o repetido de original) al sink
+    Con pending (pool de codificación) se encola para entregarlo en orden con drain
+    """
+    if pending is not None:
+        pending.append((name, data, info, original))
+    elif original is None:
+        sink.write(name, data, info)
+    else:
+        sink.write_repeat(name, original, info)
+
+def drain(sink, pending, window=0):
+    """
+    Entrega al sink, en orden, los frames del principio de la cola que ya están listos
+    Si quedan más de window en cola espera a que terminen los primeros; con
+    window=0 (al terminar la hoja) se entregan todos.
+    """
+    while pending:
+        name, data, info, original = pending[0]
+        if len(pending) <= window and isinstance(data, Future) and not data.done():
+            break
+        pending.popleft()
+        if original is not None:
+            deliver(sink, None, name, None, info, original)
+        elif isinstance(data, bytes):
+            # Reutilizado de la salida anterior (ya se mostró)
+            deliver(sink, None, name, data, info)
+        else:
+            deliver(sink, None, name, data.result(), info)
+            print(f"💾 {sink.location(name)}")
+
+def create_encode_pool(jobs, executor='thread'):
+    """
+    Crea el pool de workers para codificar frames
+    Retorna None si se debe trabajar en serie (jobs == 1)
+    """
+    if jobs == 1:
+        return None
+    
+    max_workers = jobs if jobs and jobs > 0 else os.cpu_count()
+    if executor == 'process':
+        return ProcessPoolExecutor(max_workers=max_workers)
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+def watch_sheets(input_path, prefix, options, debounce=DEFAULT_DEBOUNCE, polling=False):
+    """
+    Modo --watch: divide las hojas y vuelve a dividir cada una cuando cambia
+    
+    input_path es una hoja o una carpeta de hojas. En una carpeta el prefijo de
+    cada hoja es prefix con {stem} reemplazado por el nombre del archivo sin
+    extensión (o prefix_nombre si no lo lleva).
+    
+    El proceso sigue vivo entre divisiones: las importaciones, el pool de
+    codificación y la caché de píxeles (con --pixel-cache) se reutilizan, y el
+    manifiesto hace que solo se recodifiquen los frames que cambiaron.
+    
+    Args:
+        options: Argumentos de split_spritesheet (sin input_file ni prefix)
+        debounce: Segundos sin escrituras antes de dividir una hoja cambiada
+        polling: Revisar los archivos periódicamente en lugar de usar inotify
+    """
+    folder = os.path.isdir(input_path)
+    
+    def is_sheet(path):
+        if folder:
+            return os.path.splitext(path)[1].lower() in SHEET_EXTENSIONS and os.path.isfile(path)
+        return os.path.normpath(path) == os.path.normpath(input_path) and os.path.isfile(path)
+    
+    def sheet_prefix(path):
+        if not folder:
+            return prefix
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return prefix.replace('{stem}', stem) if '{stem}' in prefix else f"{prefix}_{stem}"
+    
+    pool = create_encode_pool(options.get('jobs', 1), options.get('executor', 'thread'))
+    
+    def split_changed(paths):
+        for path in paths:
+            if not is_sheet(path):
+                continue
+            start = time.time()
+            split_spritesheet(path, sheet_prefix(path), encode_pool=pool, **options)
+            print(f"⏱️  {path}: {time.time() - start:.2f}s")
+        print(f"\n👀 Vigilando {input_path} (Ctrl+C para salir)")
+    
+    try:
+        if folder:
+            sheets = find_images(input_path, SHEET_EXTENSIONS)
+        else:
+            sheets = [input_path]
+        split_changed(sheets)
+        watch([input_path], split_changed, debounce, polling)
+    finally:
+        if pool:
+            pool.shutdown()
+    print("\n👋 Vigilancia terminada")
 
 def main():
     # Si no hay argumentos, usar modo interactivo
@@ -541,35 +960,118 @@ Ejemplos de uso:
   # Modo línea de comandos:
   python split_spritesheet.py player.png walk --cols 8 --rows 2
   python split_spritesheet.py enemy.png attack --cols 6 --rows 1 --organize-by column
+  python split_spritesheet.py player.png walk --cols 8 --rows 2 --output build/walk.zip
+  python split_spritesheet.py player.png walk --cols 8 --rows 2 --watch
+  python split_spritesheet.py hojas/ "{stem}" --detect-grid --watch
             '''
         )
         
-        parser.add_argument('input', help='Archivo spritesheet de entrada', nargs='?')
+        parser.add_argument('input', help='Archivo spritesheet de entrada (o carpeta de hojas con --watch)', nargs='?')
         parser.add_argument('prefix', help='Prefijo para los nombres de archivo', nargs='?')
         parser.add_argument('--cols', type=int, help='Número de columnas en el spritesheet')
         parser.add_argument('--rows', type=int, help='Número de filas en el spritesheet')
         parser.add_argument('--start', type=int, default=0, help='Número inicial para los frames')
-        parser.add_argument('--format', default='PNG', choices=['PNG', 'JPEG'], help='Formato de salida')
+        parser.add_argument('--format', default='PNG', type=str.upper, choices=list(OUTPUT_FORMATS),
+                           help='Formato de salida (WEBP: con pérdida y alfa; WEBP_LOSSLESS y QOI: sin pérdida)')
         parser.add_argument('--keep-empty', action='store_true', help='Mantener frames vacíos')
+        parser.add_argument('--png-profile', choices=list(PNG_PROFILES),
+                           help='Perfil de codificación PNG (fast: rápido, smallest: archivos más pequeños)')
+        parser.add_argument('--png-compress-level', type=int, metavar='0-9',
+                           help='Nivel de compresión zlib de los PNG (por encima del perfil)')
+        parser.add_argument('--png-optimize', action='store_const', const=True,
+                           help='Pasada extra de optimización al guardar los PNG (más lenta)')
+        parser.add_argument('--png-palette', action='store_const', const=True,
+                           help='Guardar con paleta los frames de 256 colores o menos (sin pérdida)')
         parser.add_argument('--organize-by', choices=['column', 'row'], help='Organizar frames en subcarpetas')
+        parser.add_argument('--empty-policy', default='transparent', choices=list(EMPTY_POLICIES),
+                           help='Criterio para considerar un frame vacío')
+        parser.add_argument('--alpha-threshold', type=int, default=0,
+                           help='Alfa máximo de un frame vacío con --empty-policy alpha')
+        parser.add_argument('--background', help='Color de fondo con --empty-policy color (ej: #FF00FF o 255,0,255)')
+        parser.add_argument('--jobs', '-j', type=int, default=1,
+                           help='Frames a codificar en paralelo (0 = todos los núcleos)')
+        parser.add_argument('--executor', default='thread', choices=['thread', 'process'],
+                           help='Tipo de pool para --jobs (hilos o procesos)')
+        parser.add_argument('--force', action='store_true',
+                           help='Dividir y reescribir todos los frames aunque la hoja no haya cambiado')
+        parser.add_argument('--frame-size', type=parse_size,
+                           help='Tamaño de cada frame ANCHOxALTO (ej: 32x48); --cols/--rows pasan a ser opcionales')
+        parser.add_argument('--margin', type=int, default=0, help='Margen en el borde de la hoja (px)')
+        parser.add_argument('--margin-x', type=int, help='Margen horizontal (por defecto: --margin)')
+        parser.add_argument('--margin-y', type=int, help='Margen vertical (por defecto: --margin)')
+        parser.add_argument('--spacing', type=int, default=0, help='Separación entre frames (px)')
+        parser.add_argument('--spacing-x', type=int, help='Separación horizontal (por defecto: --spacing)')
+        parser.add_argument('--spacing-y', type=int, help='Separación vertical (por defecto: --spacing)')
+        parser.add_argument('--trim', action='store_true',
+                           help='Recortar cada frame a su contenido y guardar los offsets en <prefijo>_trim.json')
+        parser.add_argument('--dedup', action='store_true',
+                           help='Escribir una sola vez los frames repetidos (índice en <prefijo>_index.json)')
+        parser.add_argument('--stream', action='store_true',
+                           help='Decodificar la hoja por bandas (una fila de frames) para hojas enormes')
+        parser.add_argument('--output', '-o', default=DEFAULT_OUTPUT_DIR, metavar='DESTINO',
+                           help=f'Carpeta o archivo .zip, .tar, .tar.gz o .fpack de salida (por defecto: {DEFAULT_OUTPUT_DIR})')
+        parser.add_argument('--pixel-cache', nargs='?', const=DEFAULT_CACHE_DIR, metavar='DIR',
+                           help=f'Reutilizar los píxeles decodificados entre ejecuciones (por defecto: {DEFAULT_CACHE_DIR})')
+        parser.add_argument('--detect-grid', action='store_true',
+                           help='Deducir columnas, filas, margen y espaciado de las separaciones vacías')
+        parser.add_argument('--auto', action='store_true',
+                           help='Detectar los sprites automáticamente (hojas sin cuadrícula, sin --cols/--rows)')
+        parser.add_argument('--merge-distance', type=int, default=0,
+                           help='Con --auto, unir partes separadas por esta distancia o menos')
+        parser.add_argument('--min-area', type=int, default=0,
+                           help='Con --auto, descartar regiones con menos área (ruido)')
+        parser.add_argument('--watch', action='store_true',
+                           help='Volver a dividir la hoja (o las hojas de la carpeta) cada vez que cambie')
+        parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                           help=f'Con --watch, segundos sin escrituras antes de dividir (por defecto: {DEFAULT_DEBOUNCE})')
+        parser.add_argument('--poll', action='store_true',
+                           help='Con --watch, revisar los archivos periódicamente en lugar de usar inotify')
         
         args = parser.parse_args()
         
         # Validar argumentos para modo línea de comandos
-        if not all([args.input, args.prefix, args.cols, args.rows]):
+        if not all([args.input, args.prefix]) or not (args.auto or args.detect_grid or args.frame_size or all([args.cols, args.rows])):
             print("❌ Faltan argumentos. Usa --help para ver la ayuda.")
             return
         
-        split_spritesheet(
-            args.input,
-            args.prefix,
-            args.cols,
-            args.rows,
-            args.start,
-            args.format,
-            not args.keep_empty,
-            args.organize_by
+        options = dict(
+            cols=args.cols,
+            rows=args.rows,
+            start_number=args.start,
+            format=args.format,
+            remove_empty=not args.keep_empty,
+            organize_by=args.organize_by,
+            empty_policy=args.empty_policy,
+            alpha_threshold=args.alpha_threshold,
+            background_color=args.background,
+            jobs=args.jobs,
+            executor=args.executor,
+            force=args.force,
+            auto_detect=args.auto,
+            merge_distance=args.merge_distance,
+            min_area=args.min_area,
+            detect_grid=args.detect_grid,
+            frame_width=args.frame_size[0] if args.frame_size else None,
+            frame_height=args.frame_size[1] if args.frame_size else None,
+            margin_x=args.margin if args.margin_x is None else args.margin_x,
+            margin_y=args.margin if args.margin_y is None else args.margin_y,
+            spacing_x=args.spacing if args.spacing_x is None else args.spacing_x,
+            spacing_y=args.spacing if args.spacing_y is None else args.spacing_y,
+            trim=args.trim,
+            dedup=args.dedup,
+            pixel_cache=args.pixel_cache,
+            stream=args.stream,
+            png_profile=args.png_profile,
+            png_compress_level=args.png_compress_level,
+            png_optimize=args.png_optimize,
+            png_palette=args.png_palette,
+            output=args.output
         )
+        
+        if args.watch:
+            watch_sheets(args.input, args.prefix, options, args.debounce, args.poll)
+        else:
+            split_spritesheet(args.input, args.prefix, **options)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,142 +1,295 @@
 import os
-from PIL import Image
+import io
+import time
 import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import redirect_stdout
+import split
+from frame_analysis import EMPTY_POLICIES, parse_size
+from frame_encoding import OUTPUT_FORMATS, PNG_PROFILES, png_encoding
+from frame_pack import pack_path
+from output_sinks import DEFAULT_OUTPUT_DIR
+from manifest import (is_up_to_date, load_manifest, manifest_key, remove_stale_outputs,
+                      save_manifest)
 
 def split_spritesheet(input_file, prefix, cols, rows, 
                      start_number=0, format="PNG", remove_empty=True,
-                     organize_by=None):
+                     organize_by=None, empty_policy='transparent', alpha_threshold=0,
+                     background_color=None, force=False, update_manifest=True,
+                     previous_entry=None, manifest_checked=False, detect_grid=False,
+                     frame_width=None, frame_height=None, margin_x=0, margin_y=0, spacing_x=0,
+                     spacing_y=0, trim=False, dedup=False, stream=False, png_profile=None,
+                     png_compress_level=None, png_optimize=None, png_palette=None, pack=False):
     """
     Divide un spritesheet en frames individuales en la carpeta 'sprites'
     
+    Usa el mismo divisor que split.py (split.split_spritesheet, sobre
+    sheet_frames.iter_frames): esta función solo fija el destino ('sprites/' o
+    el paquete '<prefijo>.fpack') y la convención de nombres de este script,
+    con el nombre de la fila o columna solo en la subcarpeta.
+    
+    Si la hoja y los parámetros no cambiaron desde la última ejecución (según el
+    manifiesto de 'sprites/'), la hoja se omite sin decodificarla. Dentro de una
+    hoja modificada, los frames cuyo contenido no cambió no se vuelven a escribir.
+    
     Args:
         input_file: Ruta al spritesheet
         prefix: Prefijo para los nombres de archivo
-        cols: Número de columnas
-        rows: Número de filas  
+        cols: Número de columnas (opcional con frame_width; se ignora con detect_grid)
+        rows: Número de filas (opcional con frame_height; se ignora con detect_grid)
         start_number: Número inicial para la numeración
-        format: Formato de salida (PNG, JPEG)
+        format: Formato de salida (PNG, JPEG, WEBP, WEBP_LOSSLESS, QOI; ver OUTPUT_FORMATS)
         remove_empty: Eliminar frames completamente vacíos/transparentes
         organize_by: None, 'column', o 'row' para organizar en subcarpetas
-    """
+        empty_policy: Criterio de frame vacío ('transparent', 'alpha', 'color')
+        alpha_threshold: Alfa máximo de un frame vacío con la política 'alpha'
+        background_color: Color de fondo con la política 'color' (None = color uniforme)
+        force: Dividir y reescribir todos los frames aunque el manifiesto indique
+               que no hay cambios
+        update_manifest: Guardar la entrada de la hoja en el manifiesto al terminar
+        previous_entry: Entrada anterior del manifiesto (si no se indica, se lee del archivo)
+        manifest_checked: El llamador ya consultó el manifiesto (lotes): no se omite
+                          la hoja y solo se reutilizan los frames de previous_entry
+        detect_grid: Deducir columnas, filas, margen y espaciado de las separaciones
+                     vacías entre frames (sin intervención, para lotes)
+        frame_width, frame_height: Tamaño de cada frame en píxeles
+        margin_x, margin_y: Margen entre el borde de la hoja y los frames
+        spacing_x, spacing_y: Separación entre frames contiguos
+        trim: Recortar cada frame a su contenido y guardar el tamaño de la celda y el
+              offset del recorte en '<prefijo>_trim.json'
+        dedup: Escribir una sola vez los frames repetidos y guardar en
+               '<prefijo>_index.json' el archivo de cada número de frame y celda
+        stream: Decodificar la hoja por bandas de una fila de frames en lugar de
+                entera, para hojas que no caben en memoria (PNG de 8 bits no
+                entrelazados; otros formatos se decodifican completos)
+        png_profile: Perfil de codificación PNG ('fast', 'balanced', 'smallest');
+                     None = opciones por defecto de Pillow
+        png_compress_level: Nivel de compresión zlib 0-9 (por encima del perfil)
+        png_optimize: Pasada extra de optimización de Pillow (por encima del perfil)
+        png_palette: Guardar con paleta, sin pérdida, los frames de 256 colores o
+                     menos (por encima del perfil)
+        pack: Guardar todos los frames en un único paquete '<prefijo>.fpack' (ver
+              frame_pack) en lugar de un archivo por frame; los recortes y los
+              frames repetidos se registran dentro del paquete
     
-    # Crear directorio base 'sprites' en la raíz de ejecución
-    base_output_dir = "sprites"
-    if not os.path.exists(base_output_dir):
-        os.makedirs(base_output_dir)
-        print(f"✅ Carpeta base creada: {base_output_dir}/")
+    Returns:
+        Diccionario con 'input_file', 'saved', 'written', 'identical', 'duplicates', 'empty',
+        'unchanged', 'error' (None si todo fue bien) y 'manifest_entry'
+    """
+    return split.split_spritesheet(
+        input_file, prefix, cols, rows, start_number, format, remove_empty, organize_by,
+        empty_policy=empty_policy,
+        alpha_threshold=alpha_threshold,
+        background_color=background_color,
+        force=force,
+        detect_grid=detect_grid,
+        frame_width=frame_width,
+        frame_height=frame_height,
+        margin_x=margin_x,
+        margin_y=margin_y,
+        spacing_x=spacing_x,
+        spacing_y=spacing_y,
+        trim=trim,
+        dedup=dedup,
+        png_profile=png_profile,
+        png_compress_level=png_compress_level,
+        png_optimize=png_optimize,
+        png_palette=png_palette,
+        output=pack_path(DEFAULT_OUTPUT_DIR, prefix) if pack else DEFAULT_OUTPUT_DIR,
+        stream=stream,
+        label_names=False,
+        update_manifest=update_manifest,
+        previous_entry=previous_entry,
+        manifest_checked=manifest_checked
+    )
+
+# Opciones que admite una configuración de lote (ver config_arguments)
+CONFIG_KEYS = ('file', 'prefix', 'cols', 'rows', 'start_number', 'format', 'remove_empty', 'organize_by',
+               'empty_policy', 'alpha_threshold', 'background_color', 'detect_grid', 'frame_size',
+               'margin', 'margin_x', 'margin_y', 'spacing', 'spacing_x', 'spacing_y', 'trim', 'dedup',
+               'stream', 'png_profile', 'png_compress_level', 'png_optimize', 'png_palette', 'pack')
+
+def config_arguments(config):
+    """Convierte una configuración de lote en argumentos para split_spritesheet"""
+    frame_size = parse_size(config.get('frame_size'))
+    return {
+        'input_file': config['file'],
+        'prefix': config['prefix'],
+        'cols': config.get('cols'),
+        'rows': config.get('rows'),
+        'start_number': config.get('start_number', 0),
+        'format': config.get('format', 'PNG'),
+        'remove_empty': config.get('remove_empty', True),
+        'organize_by': config.get('organize_by', None),
+        'empty_policy': config.get('empty_policy', 'transparent'),
+        'alpha_threshold': config.get('alpha_threshold', 0),
+        'background_color': config.get('background_color', None),
+        'detect_grid': config.get('detect_grid', False),
+        'frame_width': frame_size[0] if frame_size else None,
+        'frame_height': frame_size[1] if frame_size else None,
+        'margin_x': config.get('margin_x', config.get('margin', 0)),
+        'margin_y': config.get('margin_y', config.get('margin', 0)),
+        'spacing_x': config.get('spacing_x', config.get('spacing', 0)),
+        'spacing_y': config.get('spacing_y', config.get('spacing', 0)),
+        'trim': config.get('trim', False),
+        'dedup': config.get('dedup', False),
+        'stream': config.get('stream', False),
+        'png_profile': config.get('png_profile'),
+        'png_compress_level': config.get('png_compress_level'),
+        'png_optimize': config.get('png_optimize'),
+        'png_palette': config.get('png_palette'),
+        'pack': config.get('pack', False)
+    }
+
+def split_config(config, capture_output=True, previous_entry=None):
+    """
+    Divide el spritesheet descrito por una configuración de lote
     
-    # Verificar que el archivo de entrada existe
-    if not os.path.exists(input_file):
-        print(f"❌ Error: El archivo {input_file} no existe")
-        return
+    Se ejecuta dentro de los workers del pool: la salida por consola se captura
+    en result['log'] para imprimirla de una pieza sin mezclar hojas. El
+    manifiesto lo consulta y actualiza batch_split_spritesheets, que pasa la
+    entrada anterior de la hoja en previous_entry.
+    """
+    start = time.time()
+    log = io.StringIO()
     
-    # Abrir la imagen
     try:
-        sheet = Image.open(input_file)
-        sheet_width, sheet_height = sheet.size
-        
-        # Calcular dimensiones de cada frame
-        frame_width = sheet_width // cols
-        frame_height = sheet_height // rows
-        
-        print(f"📊 Spritesheet: {sheet_width}x{sheet_height}")
-        print(f"🎬 Frames: {cols}x{rows} -> {frame_width}x{frame_height} cada uno")
+        if capture_output:
+            with redirect_stdout(log):
+                result = split_config(config, capture_output=False, previous_entry=previous_entry)
+        else:
+            result = split_spritesheet(**config_arguments(config), update_manifest=False,
+                                       previous_entry=previous_entry, manifest_checked=True)
+    except Exception as e:
+        # Configuración incompleta o error inesperado: se registra y el lote continúa
+        result = {'input_file': config.get('file'), 'saved': 0, 'written': 0, 'identical': 0, 'duplicates': 0,
+                  'empty': 0, 'unchanged': False, 'error': str(e), 'manifest_entry': None}
+    
+    result['log'] = log.getvalue()
+    result['elapsed'] = time.time() - start
+    return result
+
+def batch_split_spritesheets(configs, jobs=1, max_in_flight=None, force=False):
+    """
+    Procesa múltiples spritesheets automáticamente en la carpeta 'sprites'
+    
+    Las hojas sin cambios respecto al manifiesto se omiten antes de enviarlas
+    al pool; el manifiesto se actualiza una sola vez al final del lote.
+    
+    Args:
+        configs: Lista de configuraciones (ver CONFIG_KEYS y batch_jobs.expand_jobs)
+        jobs: Procesos en paralelo (1 = en serie, 0 = todos los núcleos)
+        max_in_flight: Máximo de hojas enviadas al pool a la vez; limita cuántas
+                       imágenes decodificadas hay en memoria (por defecto: jobs)
+        force: Dividir todas las hojas y reescribir sus frames aunque no hayan cambiado
+    
+    Returns:
+        Resumen con 'total', 'succeeded', 'failed', 'unchanged', 'frames', 'written', 'duplicates',
+        'elapsed' y 'results' (un resultado por configuración, en el mismo orden)
+    """
+    start = time.time()
+    results = [None] * len(configs)
+    manifest = load_manifest()
+    
+    # Descartar primero las hojas que no cambiaron (solo stat, sin decodificar)
+    to_split = []
+    for index, config in enumerate(configs):
+        previous_entry = None
+        try:
+            arguments = config_arguments(config)
+            input_file = arguments.pop('input_file')
+            arguments.pop('stream')  # Solo cambia cómo se decodifica, no la salida
+            encoding = png_encoding(arguments.pop('png_profile'), arguments.pop('png_compress_level'),
+                                    arguments.pop('png_optimize'), arguments.pop('png_palette'))
+            params = split.sheet_params(png_encoding=encoding, label_names=False, **arguments)
+            if not force:
+                previous_entry = manifest.get(manifest_key(input_file, arguments['prefix']))
+            unchanged = not force and is_up_to_date(manifest, input_file, params)
+        except Exception:
+            # La configuración inválida se reporta como error al procesarla
+            unchanged = False
         
-        frame_count = 0
-        saved_count = 0
+        if unchanged:
+            results[index] = {'input_file': config['file'], 'saved': 0, 'written': 0, 'identical': 0, 'duplicates': 0,
+                              'empty': 0, 'unchanged': True, 'error': None, 'manifest_entry': None}
+        else:
+            to_split.append((index, config, previous_entry))
+    
+    if jobs == 1:
+        for index, config, previous_entry in to_split:
+            print_batch_header(config.get('file'))
+            results[index] = split_config(config, False, previous_entry)
+    elif to_split:
+        max_workers = jobs if jobs and jobs > 0 else os.cpu_count()
+        max_in_flight = max(1, max_in_flight or max_workers)
+        queue = iter(to_split)
+        pending = {}
         
-        for row in range(rows):
-            for col in range(cols):
-                # Calcular coordenadas del frame
-                left = col * frame_width
-                upper = row * frame_height
-                right = left + frame_width
-                lower = upper + frame_height
-                
-                # Recortar el frame
-                frame = sheet.crop((left, upper, right, lower))
-                
-                # Verificar si el frame está vacío (opcional)
-                if remove_empty and is_empty_frame(frame):
-                    print(f"⏭️  Frame {frame_count} vacío - omitiendo")
-                    frame_count += 1
-                    continue
-                
-                # Determinar el directorio de salida según la organización
-                if organize_by == 'column':
-                    output_dir = os.path.join(base_output_dir, f"col_{col}")
-                elif organize_by == 'row':
-                    output_dir = os.path.join(base_output_dir, f"row_{row}")
-                else:
-                    output_dir = base_output_dir
-                
-                # Crear subdirectorio si es necesario
-                if organize_by and not os.path.exists(output_dir):
-                    os.makedirs(output_dir)
-                
-                # Guardar el frame
-                frame_number = start_number + saved_count
-                output_file = os.path.join(output_dir, f"{prefix}_{frame_number}.{format.lower()}")
-                frame.save(output_file, format.upper())
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            while True:
+                # Rellenar el pool sin superar el límite de hojas en vuelo
+                while len(pending) < max_in_flight:
+                    try:
+                        index, config, previous_entry = next(queue)
+                    except StopIteration:
+                        break
+                    pending[pool.submit(split_config, config, True, previous_entry)] = index
                 
-                # Mostrar mensaje con la ubicación
-                if organize_by:
-                    folder_name = os.path.basename(output_dir)
-                    print(f"💾 Guardado: {folder_name}/{prefix}_{frame_number}.{format.lower()}")
-                else:
-                    print(f"💾 Guardado: {prefix}_{frame_number}.{format.lower()}")
+                if not pending:
+                    break
                 
-                frame_count += 1
-                saved_count += 1
-        
-        # Mostrar resumen de la organización
-        print(f"\n📁 Organización: {organize_by if organize_by else 'sin subcarpetas'}")
-        print(f"🎉 Proceso completado: {saved_count} frames guardados")
-        
-        if organize_by:
-            print(f"📂 Carpeta base: {base_output_dir}/")
-            if organize_by == 'column':
-                print(f"📋 Subcarpetas creadas: {cols} columnas (col_0 a col_{cols-1})")
-            else:
-                print(f"📋 Subcarpetas creadas: {rows} filas (row_0 a row_{rows-1})")
-        
-    except Exception as e:
-        print(f"❌ Error al procesar el archivo: {e}")
-
-def is_empty_frame(image):
-    """Verifica si un frame está completamente vacío/transparente"""
-    # Convertir a RGBA si no lo es
-    if image.mode != 'RGBA':
-        image = image.convert('RGBA')
-    
-    # Obtener datos de píxeles
-    pixels = list(image.getdata())
-    
-    # Verificar si todos los píxeles son transparentes
-    for pixel in pixels:
-        if pixel[3] != 0:  # Si algún píxel no es transparente
-            return False
-    return True
-
-def batch_split_spritesheets(configs):
-    """Procesa múltiples spritesheets automáticamente en la carpeta 'sprites'"""
-    for config in configs:
-        input_file = config['file']
-        
-        print(f"\n{'='*50}")
-        print(f"🔄 Procesando: {input_file}")
-        print(f"{'='*50}")
-        
-        split_spritesheet(
-            input_file,
-            config['prefix'],
-            config['cols'],
-            config['rows'],
-            config.get('start_number', 0),
-            config.get('format', 'PNG'),
-            config.get('remove_empty', True),
-            config.get('organize_by', None)
-        )
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    results[index] = future.result()
+                    print_batch_header(results[index]['input_file'])
+                    print(results[index]['log'], end='')
+    
+    # Actualizar el manifiesto con las hojas divididas en este lote
+    for result in results:
+        entry = result.get('manifest_entry')
+        if entry:
+            key = manifest_key(entry['source'], entry['params']['prefix'])
+            remove_stale_outputs(manifest.get(key), entry)
+            manifest[key] = entry
+    save_manifest(manifest)
+    
+    succeeded = [r for r in results if not r['error']]
+    return {
+        'total': len(results),
+        'succeeded': len(succeeded),
+        'failed': len(results) - len(succeeded),
+        'unchanged': sum(1 for r in results if r['unchanged']),
+        'frames': sum(r['saved'] for r in succeeded),
+        'written': sum(r['written'] for r in succeeded),
+        'duplicates': sum(r['duplicates'] for r in succeeded),
+        'elapsed': time.time() - start,
+        'results': results
+    }
+
+def print_batch_header(input_file):
+    """Muestra la cabecera de una hoja dentro del lote"""
+    print(f"\n{'='*50}")
+    print(f"🔄 Procesando: {input_file}")
+    print(f"{'='*50}")
+
+def print_batch_summary(summary):
+    """Muestra el resumen de un procesamiento por lotes"""
+    print("\n" + "="*50)
+    print("📊 RESUMEN DEL LOTE")
+    print("="*50)
+    print(f"✅ Hojas procesadas: {summary['succeeded']}/{summary['total']}")
+    print(f"⏩ Hojas sin cambios (omitidas): {summary['unchanged']}")
+    print(f"🖼️  Frames guardados: {summary['frames']} "
+          f"({summary['written']} escritos, {summary['frames'] - summary['written'] - summary['duplicates']} "
+          f"sin cambios, {summary['duplicates']} repetidos)")
+    print(f"⏱️  Tiempo total: {summary['elapsed']:.2f}s")
+    
+    failed = [r for r in summary['results'] if r['error']]
+    if failed:
+        print(f"\n❌ HOJAS CON ERROR ({len(failed)}):")
+        for result in failed:
+            print(f"   📄 {result['input_file']}: {result['error']}")
 
 def main():
     parser = argparse.ArgumentParser(
@@ -158,20 +311,69 @@ Ejemplos de uso:
 
   # Mantener frames vacíos
   python split_spritesheet.py effects.png explosion --cols 5 --rows 1 --keep-empty
+
+  # Frames de 32x32 con 1px de margen y 2px de separación
+  python split_spritesheet.py tiles.png tile --frame-size 32x32 --margin 1 --spacing 2
+
+  # Deducir la cuadrícula (columnas, filas, margen y espaciado)
+  python split_spritesheet.py tiles.png tile --detect-grid
+
+  # Todos los frames en un único paquete sprites/player_walk.fpack
+  python split_spritesheet.py player.png player_walk --cols 8 --rows 2 --pack
+
+  # Builds de desarrollo: PNG con compresión rápida (archivos más grandes)
+  python split_spritesheet.py player.png player_walk --cols 8 --rows 2 --png-profile fast
         '''
     )
     
     parser.add_argument('input', help='Archivo spritesheet de entrada')
     parser.add_argument('prefix', help='Prefijo para los nombres de archivo (ej: player_walk)')
-    parser.add_argument('--cols', type=int, required=True, help='Número de columnas en el spritesheet')
-    parser.add_argument('--rows', type=int, required=True, help='Número de filas en el spritesheet')
+    parser.add_argument('--cols', type=int, help='Número de columnas en el spritesheet')
+    parser.add_argument('--rows', type=int, help='Número de filas en el spritesheet')
+    parser.add_argument('--frame-size', type=parse_size,
+                       help='Tamaño de cada frame ANCHOxALTO (ej: 32x48); --cols/--rows pasan a ser opcionales')
+    parser.add_argument('--margin', type=int, default=0, help='Margen en el borde de la hoja en px (por defecto: 0)')
+    parser.add_argument('--margin-x', type=int, help='Margen horizontal (por defecto: --margin)')
+    parser.add_argument('--margin-y', type=int, help='Margen vertical (por defecto: --margin)')
+    parser.add_argument('--spacing', type=int, default=0, help='Separación entre frames en px (por defecto: 0)')
+    parser.add_argument('--spacing-x', type=int, help='Separación horizontal (por defecto: --spacing)')
+    parser.add_argument('--spacing-y', type=int, help='Separación vertical (por defecto: --spacing)')
+    parser.add_argument('--trim', action='store_true',
+                       help='Recortar cada frame a su contenido y guardar los offsets en <prefijo>_trim.json')
+    parser.add_argument('--dedup', action='store_true',
+                       help='Escribir una sola vez los frames repetidos (índice en <prefijo>_index.json)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Decodificar la hoja por bandas (una fila de frames) para hojas enormes')
+    parser.add_argument('--pack', action='store_true',
+                       help='Guardar todos los frames en un único paquete <prefijo>.fpack')
+    parser.add_argument('--detect-grid', action='store_true',
+                       help='Deducir columnas, filas, margen y espaciado de las separaciones vacías')
     parser.add_argument('--start', type=int, default=0, help='Número inicial para los frames (por defecto: 0)')
-    parser.add_argument('--format', default='PNG', choices=['PNG', 'JPEG'], help='Formato de salida (por defecto: PNG)')
+    parser.add_argument('--format', default='PNG', type=str.upper, choices=list(OUTPUT_FORMATS),
+                       help='Formato de salida: PNG, JPEG (sin alfa), WEBP (con pérdida y alfa), '
+                            'WEBP_LOSSLESS o QOI (por defecto: PNG)')
     parser.add_argument('--keep-empty', action='store_true', help='Mantener frames vacíos (por defecto: se eliminan)')
+    parser.add_argument('--png-profile', choices=list(PNG_PROFILES),
+                       help='Perfil de codificación PNG (fast: rápido, smallest: archivos más pequeños)')
+    parser.add_argument('--png-compress-level', type=int, metavar='0-9',
+                       help='Nivel de compresión zlib de los PNG (por encima del perfil)')
+    parser.add_argument('--png-optimize', action='store_const', const=True,
+                       help='Pasada extra de optimización al guardar los PNG (más lenta)')
+    parser.add_argument('--png-palette', action='store_const', const=True,
+                       help='Guardar con paleta los frames de 256 colores o menos (sin pérdida)')
     parser.add_argument('--organize-by', choices=['column', 'row'], 
                        help='Organizar frames en subcarpetas por columna o fila')
+    parser.add_argument('--empty-policy', default='transparent', choices=list(EMPTY_POLICIES),
+                       help='Criterio para considerar un frame vacío (por defecto: transparent)')
+    parser.add_argument('--alpha-threshold', type=int, default=0,
+                       help='Alfa máximo de un frame vacío con --empty-policy alpha (por defecto: 0)')
+    parser.add_argument('--background', help='Color de fondo con --empty-policy color (ej: #FF00FF o 255,0,255)')
+    parser.add_argument('--force', action='store_true',
+                       help='Dividir y reescribir todos los frames aunque la hoja no haya cambiado')
     
     args = parser.parse_args()
+    if not (args.detect_grid or args.frame_size or (args.cols and args.rows)):
+        parser.error('indica --cols y --rows, --frame-size o usa --detect-grid')
     
     split_spritesheet(
         args.input,
@@ -181,7 +383,26 @@ Ejemplos de uso:
         args.start,
         args.format,
         not args.keep_empty,  # Invertir porque remove_empty=True por defecto
-        args.organize_by
+        args.organize_by,
+        args.empty_policy,
+        args.alpha_threshold,
+        args.background,
+        args.force,
+        detect_grid=args.detect_grid,
+        frame_width=args.frame_size[0] if args.frame_size else None,
+        frame_height=args.frame_size[1] if args.frame_size else None,
+        margin_x=args.margin if args.margin_x is None else args.margin_x,
+        margin_y=args.margin if args.margin_y is None else args.margin_y,
+        spacing_x=args.spacing if args.spacing_x is None else args.spacing_x,
+        spacing_y=args.spacing if args.spacing_y is None else args.spacing_y,
+        trim=args.trim,
+        dedup=args.dedup,
+        stream=args.stream,
+        png_profile=args.png_profile,
+        png_compress_level=args.png_compress_level,
+        png_optimize=args.png_optimize,
+        png_palette=args.png_palette,
+        pack=args.pack
     )
 
 if __name__ == "__main__":